@@ -11,503 +11,4019 @@ TGStat.ru Parser - Адаптированный для Windows/PyCharm
 
 import os
 import sys
+import platform
 import time
 import random
 import logging
-import requests
+import importlib
 import json
 import re
+import base64
+import copy
+import gzip
+import hashlib
+import heapq
+import queue
+import socket
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import parse_qs, urlparse
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-import zipfile
-import subprocess
-
-# Selenium imports
-try:
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-    from selenium.webdriver.common.action_chains import ActionChains
-except ImportError:
-    print("❌ Ошибка: Selenium не установлен!")
-    print("Выполните: pip install selenium requests")
-    sys.exit(1)
+from typing import Callable, List, Dict, Optional, Tuple
+
+
+class LazyModule:
+    """Модуль, который импортируется при первом обращении к его атрибутам"""
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# Тяжелые модули нужны только для обхода и загрузки драйвера - откладываем импорт
+requests = LazyModule("requests")
+zipfile = LazyModule("zipfile")
+subprocess = LazyModule("subprocess")
+sqlite3 = LazyModule("sqlite3")
+asyncio = LazyModule("asyncio")
+
+# Selenium загружается функцией load_selenium() перед запуском браузера
+webdriver = None
+By = None
+WebDriverWait = None
+EC = None
+Options = None
+Service = None
+ActionChains = None
+TimeoutException = None
+NoSuchElementException = None
+WebDriverException = None
+JavascriptException = None
+
+
+def load_selenium() -> bool:
+    """Импорт Selenium при первой необходимости (False - не установлен)"""
+    global webdriver, By, WebDriverWait, EC, Options, Service, ActionChains
+    global TimeoutException, NoSuchElementException, WebDriverException, JavascriptException
+    
+    if webdriver is not None:
+        return True
+    
+    try:
+        from selenium import webdriver as selenium_webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from selenium.common.exceptions import (
+            TimeoutException, NoSuchElementException, WebDriverException, JavascriptException
+        )
+        from selenium.webdriver.common.action_chains import ActionChains
+    except ImportError:
+        print("❌ Ошибка: Selenium не установлен!")
+        print("Выполните: pip install selenium requests")
+        return False
+    
+    webdriver = selenium_webdriver
+    return True
+
+
+# Необязательные модули тоже импортируются при первой необходимости:
+# httpx - асинхронный HTTP-клиент для параллельного обхода, psutil - замер
+# памяти процессов браузера, lxml - HTML-парсер для извлечения без браузера
+httpx = None
+psutil = None
+lxml_html = None
+CSSSelector = None
+
+
+def load_httpx() -> bool:
+    """Импорт httpx при первой необходимости (False - не установлен)"""
+    global httpx
+    
+    if httpx is None:
+        try:
+            import httpx
+        except ImportError:
+            return False
+    return True
+
+
+def load_psutil() -> bool:
+    """Импорт psutil при первой необходимости (False - не установлен)"""
+    global psutil
+    
+    if psutil is None:
+        try:
+            import psutil
+        except ImportError:
+            return False
+    return True
+
+
+def load_lxml() -> bool:
+    """Импорт lxml и cssselect при первой необходимости (False - не установлены)"""
+    global lxml_html, CSSSelector
+    
+    if lxml_html is None:
+        try:
+            from lxml import html as lxml_module
+            from lxml.cssselect import CSSSelector
+        except ImportError:
+            return False
+        lxml_html = lxml_module
+    return True
+
+
+# Селекторы ссылок на каналы (в порядке приоритета)
+CHANNEL_LINK_SELECTORS = [
+    "a[href*='t.me/']",
+    "[data-channel]",
+    ".channel-item",
+    ".channel-link",
+    "a[href*='telegram']",
+]
+
+# Селекторы ссылок на категории (в порядке приоритета)
+CATEGORY_SELECTORS = [
+    "a[href*='/channels/']",
+    "a[href*='/chats/']",
+    ".category-link",
+    ".nav-link",
+    "[data-category]",
+]
+
+# Исполняемые файлы Chrome/Chromium в Linux и macOS
+CHROME_BINARIES_POSIX = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+# Актуальные версии ChromeDriver по мажорным версиям Chrome
+CHROME_FOR_TESTING_MILESTONES_URL = (
+    "https://googlechromelabs.github.io/chrome-for-testing/latest-versions-per-milestone-with-downloads.json"
+)
+
+# Элементы страницы проверки Cloudflare
+CLOUDFLARE_SELECTOR = ".cf-browser-verification, .cf-checking-browser, .cf-spinner-allow-5-secs"
+
+# Блокируемые в headless-профиле запросы (Network.setBlockedURLs):
+# изображения, шрифты, стили, аналитика и реклама
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+    "*.mp4", "*.webm",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*mc.yandex.ru*", "*an.yandex.ru*", "*yandex.ru/ads*",
+    "*top-fwz1.mail.ru*", "*facebook.net*", "*vk.com/rtrg*",
+]
+
+# Селекторы названия и количества подписчиков внутри карточки
+CHANNEL_NAME_SELECTOR = ".title, .name, .channel-name, h3, h4, .text-lg, .font-bold"
+CHANNEL_SUBSCRIBERS_SELECTOR = ".subscribers, .members, .count, .number"
+SUBSCRIBER_KEYWORDS = ['подписчик', 'member', 'участник', 'k', 'm']
+
+# Скрипт пакетного извлечения: собирает все карточки за один вызов execute_script.
+# Селекторы перебираются по порядку до первого, давшего ссылки на t.me
+BULK_EXTRACT_SCRIPT = """
+const linkSelectors = arguments[0];
+const nameSelector = arguments[1];
+const subscribersSelector = arguments[2];
+const text = (el) => (el.innerText || el.textContent || '').trim();
+for (const selector of linkSelectors) {
+    let elements;
+    try {
+        elements = document.querySelectorAll(selector);
+    } catch (e) {
+        continue;
+    }
+    const cards = [];
+    for (const el of elements) {
+        const href = el.href || el.getAttribute('href') || '';
+        if (!href || href.indexOf('t.me/') === -1) continue;
+        const parent = el.parentElement;
+        if (!parent) {
+            cards.push({href: href, name: '', subscribers: []});
+            continue;
+        }
+        const nameEl = parent.querySelector(nameSelector);
+        cards.push({
+            href: href,
+            name: nameEl ? text(nameEl) : null,
+            subscribers: Array.from(parent.querySelectorAll(subscribersSelector), text),
+        });
+    }
+    if (cards.length) return JSON.stringify({selector: selector, cards: cards});
+}
+return JSON.stringify({selector: null, cards: []});
+"""
+
+
+# Состояние страницы для проверки готовности (один вызов на опрос)
+PAGE_STATE_SCRIPT = """
+const challengeSelector = arguments[0];
+const listingSelector = arguments[1];
+return {
+    readyState: document.readyState,
+    challenge: !!document.querySelector(challengeSelector),
+    listing: listingSelector ? !!document.querySelector(listingSelector) : false,
+    url: location.href,
+};
+"""
+
+
+# Объем переданных данных и время загрузки страницы (Performance API)
+PAGE_METRICS_SCRIPT = """
+const navigation = performance.getEntriesByType('navigation')[0];
+let bytes = navigation ? navigation.transferSize : 0;
+for (const entry of performance.getEntriesByType('resource')) {
+    bytes += entry.transferSize || 0;
+}
+return {
+    bytes: bytes,
+    loadMs: navigation ? (navigation.loadEventEnd || navigation.domContentLoadedEventEnd) - navigation.startTime : 0,
+};
+"""
+
+
+# Шаг прокрутки для ленивой подгрузки (execute_async_script).
+# Каждый шаг прокручивает сразу до конца документа, поэтому статичная
+# страница завершается за одно окно тишины. MutationObserver отмечает момент
+# последнего роста числа карточек; шаг завершается, когда рост прекратился
+# на quietMs или истек maxWaitMs.
+HARVEST_STEP_SCRIPT = """
+const cardSelector = arguments[0];
+const quietMs = arguments[1];
+const maxWaitMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const countCards = () => document.querySelectorAll(cardSelector).length;
+if (!window.__tgstatHarvest) {
+    const state = {count: countCards(), lastGrowth: Date.now()};
+    new MutationObserver(() => {
+        const count = countCards();
+        if (count > state.count) {
+            state.count = count;
+            state.lastGrowth = Date.now();
+        }
+    }).observe(document.body, {childList: true, subtree: true});
+    window.__tgstatHarvest = state;
+}
+const state = window.__tgstatHarvest;
+const before = countCards();
+const started = Date.now();
+window.scrollTo(0, document.body.scrollHeight);
+const check = () => {
+    const now = Date.now();
+    if (now - Math.max(state.lastGrowth, started) >= quietMs || now - started >= maxWaitMs) {
+        done({
+            before: before,
+            after: countCards(),
+            atBottom: window.innerHeight + window.scrollY >= document.body.scrollHeight - 2,
+            elapsed: now - started,
+        });
+    } else {
+        setTimeout(check, 50);
+    }
+};
+setTimeout(check, 50);
+"""
+
+
+def chromedriver_filename() -> str:
+    """Имя исполняемого файла ChromeDriver для текущей ОС"""
+    return "chromedriver.exe" if os.name == "nt" else "chromedriver"
+
+
+def chrome_platform() -> str:
+    """Идентификатор платформы в терминах Chrome for Testing"""
+    if sys.platform.startswith("win"):
+        return "win64"
+    if sys.platform == "darwin":
+        return "mac-arm64" if platform.machine() == "arm64" else "mac-x64"
+    return "linux64"
+
+
+def file_sha256(path: Path) -> str:
+    """Контрольная сумма файла"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_free_port() -> int:
+    """Свободный локальный порт (для --remote-debugging-port)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_browser_rss(driver) -> Optional[int]:
+    """Суммарный RSS дерева процессов браузера в байтах (None - замер недоступен)"""
+    if driver is None or not load_psutil():
+        return None
+    
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except Exception:
+        return None
+    
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+def build_channel_record(link: str, name: Optional[str] = None, subscriber_texts: List[str] = (),
+                         has_context: bool = True) -> Optional[Dict[str, str]]:
+    """Формирование записи о канале из ссылки и текста карточки
+    
+    name=None означает, что название в карточке не найдено, пустая строка -
+    что найдено пустое (тогда используется username).
+    """
+    username_match = re.search(r't\.me/([a-zA-Z0-9_]+)', link)
+    if not username_match:
+        return None
+    
+    username = username_match.group(1)
+    
+    if not has_context:
+        name = username
+    elif name is None:
+        name = "Неизвестный канал"
+    else:
+        name = name or username
+    
+    subscribers = "Неизвестно"
+    for sub_text in subscriber_texts:
+        if any(keyword in sub_text.lower() for keyword in SUBSCRIBER_KEYWORDS):
+            subscribers = sub_text
+            break
+    
+    return {
+        "name": name,
+        "url": link,
+        "subscribers": subscribers,
+        "username": username
+    }
+
+
+_compiled_selectors: Dict[str, "CSSSelector"] = {}
+
+
+def _css(selector: str) -> "CSSSelector":
+    """Скомпилированный CSS-селектор для lxml (компилируется один раз)"""
+    compiled = _compiled_selectors.get(selector)
+    if compiled is None:
+        compiled = _compiled_selectors[selector] = CSSSelector(selector)
+    return compiled
+
+
+def _element_text(element) -> str:
+    """Текст элемента с нормализованными пробелами (аналог .text в Selenium)"""
+    return " ".join(element.text_content().split())
+
+
+def extract_channels_from_html(html, link_selectors: Optional[List[str]] = None) -> List[Dict[str, str]]:
+    """Извлечение каналов из HTML-кода страницы без WebDriver
+    
+    Принимает str или bytes (например, driver.page_source, сохраненную страницу
+    или тело HTTP-ответа). Функция не зависит от состояния парсера, поэтому
+    ее можно запускать в отдельном потоке или процессе. Селекторы ссылок
+    перебираются по порядку до первого сработавшего.
+    """
+    return extract_channels_with_selector(html, link_selectors)[1]
+
+
+def extract_channels_with_selector(html, link_selectors: Optional[List[str]] = None
+                                   ) -> Tuple[Optional[str], List[Dict[str, str]]]:
+    """То же, что extract_channels_from_html, плюс сработавший селектор (None - ни один)"""
+    if not load_lxml():
+        raise RuntimeError("lxml не установлен. Выполните: pip install lxml cssselect")
+    
+    if not html:
+        return None, []
+    
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", "replace")
+    
+    document = lxml_html.document_fromstring(html)
+    found_links = []
+    matched = None
+    
+    for selector in link_selectors or CHANNEL_LINK_SELECTORS:
+        for element in _css(selector)(document):
+            link = element.get("href")
+            if link and "t.me/" in link:
+                found_links.append((element, link))
+        
+        if found_links:
+            matched = selector
+            break
+    
+    # Дополнительный поиск прямыми ссылками
+    if not found_links:
+        for username in re.findall(r'https?://t\.me/([a-zA-Z0-9_]+)', html):
+            found_links.append((None, f"https://t.me/{username}"))
+    
+    channels = []
+    for element, link in found_links:
+        name = None
+        subscriber_texts = []
+        
+        if element is not None:
+            parent = element.getparent()
+            if parent is None:
+                name = ""
+            else:
+                name_candidates = _css(CHANNEL_NAME_SELECTOR)(parent)
+                if name_candidates:
+                    name = _element_text(name_candidates[0])
+                subscriber_texts = [_element_text(sub) for sub in _css(CHANNEL_SUBSCRIBERS_SELECTOR)(parent)]
+        
+        record = build_channel_record(link, name, subscriber_texts, has_context=element is not None)
+        if record:
+            channels.append(record)
+    
+    return matched, channels
+
+
+# Признаки страницы-проверки (Cloudflare и подобные) в ответе без браузера
+CHALLENGE_MARKERS = [
+    "cf-browser-verification",
+    "cf-challenge",
+    "cf_chl_opt",
+    "Just a moment...",
+    "Checking your browser",
+]
+CHALLENGE_TITLE_PATTERN = re.compile(r"<title>\s*Just a moment\.\.\.\s*</title>", re.IGNORECASE)
+
+# Номера страниц в ссылках и атрибутах пагинатора
+PAGER_PAGE_PATTERN = re.compile(r'(?:[?&]page=|data-page=["\']?)(\d+)')
+
+# Номер последней страницы по пагинатору открытой страницы (null - пагинатора нет)
+PAGER_SCRIPT = """
+const pages = [];
+document.querySelectorAll('a[href*="page="], [data-page]').forEach(el => {
+    const match = (el.getAttribute('href') || '').match(/[?&]page=(\\d+)/);
+    if (match) pages.push(parseInt(match[1], 10));
+    const dataPage = parseInt(el.getAttribute('data-page'), 10);
+    if (!isNaN(dataPage)) pages.push(dataPage);
+});
+return pages.length ? Math.max(...pages) : null;
+"""
+
+
+def extract_last_page(html: str) -> Optional[int]:
+    """Наибольший номер страницы в ссылках пагинатора (None - пагинатора нет)
+    
+    Это нижняя граница, а не конец листинга: пагинатор может показывать
+    только окно номеров или одну ссылку "Далее".
+    """
+    pages = [int(number) for number in PAGER_PAGE_PATTERN.findall(html)]
+    return max(pages) if pages else None
+
+
+def is_same_page(current_url: str, target_url: str) -> bool:
+    """Открыта ли страница target_url (без учета www, слеша в конце и прочих параметров)"""
+    current, target = urlparse(current_url), urlparse(target_url)
+    
+    def host(parsed) -> str:
+        return re.sub(r'^www\.', '', parsed.netloc.lower())
+    
+    def page(parsed) -> str:
+        return parse_qs(parsed.query).get("page", ["1"])[0]
+    
+    return (host(current) == host(target) and current.path.rstrip("/") == target.path.rstrip("/")
+            and page(current) == page(target))
+
+
+def trim_pages(pending: deque, retry_queue: List[Tuple[float, int]], last_page: int) -> int:
+    """Удаление из очередей страниц после last_page; возвращает число удаленных"""
+    kept_pending = [page for page in pending if page <= last_page]
+    kept_retries = [item for item in retry_queue if item[1] <= last_page]
+    removed = len(pending) - len(kept_pending) + len(retry_queue) - len(kept_retries)
+    
+    pending.clear()
+    pending.extend(kept_pending)
+    retry_queue[:] = kept_retries
+    heapq.heapify(retry_queue)
+    return removed
+
+
+def is_challenge_page(html: str, status_code: int = 200) -> bool:
+    """Проверка, что ответ является страницей проверки, а не контентом
+    
+    Cloudflare подключает свои скрипты и к обычным страницам, поэтому
+    маркеры проверяются только в ответах 403/429/503; с кодом 200 страницей
+    проверки считается только страница с заголовком "Just a moment...".
+    """
+    if CHALLENGE_TITLE_PATTERN.search(html):
+        return True
+    if status_code not in (403, 429, 503):
+        return False
+    return "cloudflare" in html.lower() or any(marker in html for marker in CHALLENGE_MARKERS)
+
+
+def extract_categories_from_html(html, content_type: str, base_url: str,
+                                 selectors: Optional[List[str]] = None) -> List[Dict[str, str]]:
+    """Извлечение категорий из HTML-кода страницы без WebDriver"""
+    return extract_categories_with_selector(html, content_type, base_url, selectors)[1]
+
+
+def extract_categories_with_selector(html, content_type: str, base_url: str, selectors: Optional[List[str]] = None
+                                     ) -> Tuple[Optional[str], List[Dict[str, str]]]:
+    """То же, что extract_categories_from_html, плюс сработавший селектор (None - ни один)"""
+    if not load_lxml():
+        raise RuntimeError("lxml не установлен. Выполните: pip install lxml cssselect")
+    
+    if not html:
+        return None, []
+    
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", "replace")
+    
+    document = lxml_html.document_fromstring(html)
+    document.make_links_absolute(base_url)
+    
+    for selector in selectors or CATEGORY_SELECTORS:
+        categories = []
+        for element in _css(selector)(document):
+            link = element.get("href")
+            text = _element_text(element)
+            
+            if link and text and ("channels" in link or "chats" in link):
+                categories.append({
+                    "name": text,
+                    "url": link,
+                    "type": content_type
+                })
+        
+        if categories:
+            return selector, categories
+    
+    return None, []
+
+
+def _channels_from_fragment(fragment: str) -> List[Dict[str, str]]:
+    """Каналы из HTML-фрагмента (через lxml, либо регуляркой без него)"""
+    if load_lxml():
+        return extract_channels_from_html(fragment)
+    
+    channels = []
+    for username in re.findall(r'https?://t\.me/([a-zA-Z0-9_]+)', fragment):
+        record = build_channel_record(f"https://t.me/{username}", has_context=False)
+        if record:
+            channels.append(record)
+    return channels
+
+
+def _walk_payload(node, channels: List[Dict[str, str]]):
+    """Рекурсивный обход JSON-ответа в поисках каналов и HTML-фрагментов"""
+    if isinstance(node, dict):
+        link = next((node[key] for key in ("link", "url", "href")
+                     if isinstance(node.get(key), str) and "t.me/" in node[key]), None)
+        if link is None and isinstance(node.get("username"), str) and node["username"]:
+            link = f"https://t.me/{node['username'].lstrip('@')}"
+        
+        if link:
+            subscriber_texts = []
+            for key, suffix in (("subscribers", "подписчиков"), ("participants_count", "участников"),
+                                ("members", "участников"), ("members_count", "участников")):
+                value = node.get(key)
+                if isinstance(value, (int, float)):
+                    subscriber_texts.append(f"{value} {suffix}")
+                elif isinstance(value, str) and value:
+                    subscriber_texts.append(value)
+            
+            record = build_channel_record(link, node.get("title") or node.get("name") or "", subscriber_texts)
+            if record:
+                channels.append(record)
+                return
+        
+        for value in node.values():
+            _walk_payload(value, channels)
+    
+    elif isinstance(node, list):
+        for value in node:
+            _walk_payload(value, channels)
+    
+    elif isinstance(node, str) and "<" in node and "t.me/" in node:
+        channels.extend(_channels_from_fragment(node))
+
+
+def extract_channels_from_payload(body: str, mime_type: str = "") -> List[Dict[str, str]]:
+    """Извлечение каналов из тела XHR-ответа (JSON или HTML-фрагмент)"""
+    if not body or "t.me/" not in body:
+        return []
+    
+    channels = []
+    if "json" in mime_type or body.lstrip().startswith(("{", "[")):
+        try:
+            _walk_payload(json.loads(body), channels)
+            return channels
+        except ValueError:
+            pass
+    
+    return _channels_from_fragment(body)
+
+
+class SelectorCache:
+    """Кэш сработавших селекторов по типам страниц
+    
+    Для каждого типа страницы запоминается селектор, который последним дал
+    результат. Он пробуется первым, остальные пропускаются, пока победитель
+    продолжает находить элементы. Выбор сохраняется в JSON между запусками.
+    Кэш общий для сессий пула, поэтому запись защищена блокировкой.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.winners: Dict[str, str] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        """Загрузка сохраненных победителей"""
+        try:
+            if self.path.exists():
+                self.winners = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.winners = {}
+    
+    def save(self):
+        """Сохранение победителей на диск"""
+        try:
+            self.path.parent.mkdir(exist_ok=True)
+            self.path.write_text(json.dumps(self.winners, ensure_ascii=False, indent=2), encoding='utf-8')
+        except OSError:
+            pass
+    
+    def ordered(self, page_type: str, selectors: List[str]) -> List[str]:
+        """Селекторы в порядке проб: сначала победитель"""
+        winner = self.winners.get(page_type)
+        if winner in selectors:
+            return [winner] + [selector for selector in selectors if selector != winner]
+        return list(selectors)
+    
+    def record(self, page_type: str, selector: str):
+        """Запоминание селектора, давшего результат"""
+        with self.lock:
+            if self.winners.get(page_type) != selector:
+                self.winners[page_type] = selector
+                self.save()
+    
+    def count(self, page_type: str, ordered: List[str], selector: Optional[str]):
+        """Учет перебора, выполненного вне кэша (скриптом в браузере или в lxml)
+        
+        ordered - порядок, в котором пробовались селекторы, selector - сработавший
+        (None - ни один). Сработавший селектор запоминается.
+        """
+        with self.lock:
+            counters = self.stats.setdefault(page_type, {"hits": 0, "misses": 0, "skipped": 0})
+            if selector in ordered:
+                index = ordered.index(selector)
+                counters["hits"] += 1
+                counters["misses"] += index
+                counters["skipped"] += len(ordered) - index - 1
+            else:
+                counters["misses"] += len(ordered)
+        
+        if selector in ordered:
+            self.record(page_type, selector)
+    
+    def find(self, page_type: str, selectors: List[str], probe: Callable[[str], list]) -> Tuple[Optional[str], list]:
+        """Поиск первого селектора, для которого probe вернул непустой результат"""
+        ordered = self.ordered(page_type, selectors)
+        
+        for selector in ordered:
+            try:
+                result = probe(selector)
+            except Exception:
+                result = None
+            
+            if result:
+                self.count(page_type, ordered, selector)
+                return selector, result
+        
+        self.count(page_type, ordered, None)
+        return None, []
+
+
+class KnownChannelsStore:
+    """Каналы, полученные в прошлых запусках, по категориям
+    
+    Для каждого username хранится отпечаток записи (название и подписчики),
+    по которому повторный обход отличает новые и изменившиеся каналы от
+    уже известных. Хранится в JSON между запусками.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.categories: Dict[str, Dict[str, str]] = {}
+        self.load()
+    
+    @staticmethod
+    def fingerprint(record: Dict[str, str]) -> str:
+        """Отпечаток изменяемых полей записи"""
+        return hashlib.sha1(f"{record['name']}\n{record['subscribers']}".encode('utf-8')).hexdigest()[:16]
+    
+    def load(self):
+        """Загрузка известных каналов"""
+        try:
+            if self.path.exists():
+                self.categories = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.categories = {}
+    
+    def save(self):
+        """Сохранение известных каналов на диск"""
+        try:
+            self.path.parent.mkdir(exist_ok=True)
+            self.path.write_text(json.dumps(self.categories, ensure_ascii=False), encoding='utf-8')
+        except OSError:
+            pass
+    
+    def classify(self, category: str, records: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], int, int]:
+        """Отбор новых и изменившихся записей с обновлением отпечатков
+        
+        Возвращает (новые и изменившиеся записи, число новых, число изменившихся).
+        """
+        known = self.categories.setdefault(category, {})
+        fresh = []
+        new_count = changed_count = 0
+        
+        for record in records:
+            fingerprint = self.fingerprint(record)
+            previous = known.get(record["username"])
+            
+            if previous == fingerprint:
+                continue
+            
+            if previous is None:
+                new_count += 1
+            else:
+                changed_count += 1
+            known[record["username"]] = fingerprint
+            fresh.append(record)
+        
+        return fresh, new_count, changed_count
+
+
+class CategoryProgress:
+    """Состояние обхода одной категории
+    
+    end_page - последняя нужная страница (None - пока не известна),
+    end_reason - "end" (конец листинга) или "known" (только известные каналы),
+    known_pages - сколько страниц точно есть по пагинатору (нижняя граница),
+    released - до какой страницы записи уже выданы по порядку.
+    """
+    
+    def __init__(self, url: str, name: str = "", content_type: str = "channels"):
+        self.url = url
+        self.name = name
+        self.content_type = content_type
+        self.seen_usernames = set()
+        self.known_streak = 0
+        self.pages = 0
+        self.end_page: Optional[int] = None
+        self.end_reason: Optional[str] = None
+        self.page_records: Dict[int, List[Dict[str, str]]] = {}
+        self.outstanding = 0
+        self.next_page = 1
+        self.known_pages = 0
+        self.released = 0
+        self.done = False
+    
+    def to_state(self) -> Dict:
+        """Состояние дедупликации и границ для контрольной точки"""
+        return {
+            "seen_usernames": sorted(self.seen_usernames),
+            "known_streak": self.known_streak,
+            "pages": self.pages,
+            "end_page": self.end_page,
+            "end_reason": self.end_reason,
+            "released": self.released,
+            "page_records": {str(page): records for page, records in self.page_records.items()},
+        }
+    
+    def restore(self, state: Dict):
+        """Восстановление состояния из контрольной точки"""
+        self.seen_usernames = set(state["seen_usernames"])
+        self.known_streak = state["known_streak"]
+        self.pages = state["pages"]
+        self.end_page = state["end_page"]
+        self.end_reason = state["end_reason"]
+        self.released = state.get("released", 0)
+        self.page_records = {int(page): records for page, records in state.get("page_records", {}).items()}
+    
+    def finish(self, page: int, reason: str):
+        """Ограничение обхода страницей page (берется наименьшая из найденных границ)"""
+        if self.end_page is None or page < self.end_page:
+            self.end_page = page
+            self.end_reason = reason
+    
+    def records(self) -> List[Dict[str, str]]:
+        """Записи категории в порядке страниц"""
+        return [record for page in sorted(self.page_records) for record in self.page_records[page]]
+    
+    def release(self, final: bool = False) -> List[Dict[str, str]]:
+        """Записи страниц, идущих подряд после уже выданных (с final - всех оставшихся)
+        
+        Страница, полученная раньше предыдущей (например, пока та ждет
+        повтора), остается в page_records до получения всех предыдущих.
+        """
+        records = []
+        while self.page_records:
+            page = self.released + 1
+            if page not in self.page_records:
+                if not final:
+                    break
+                page = min(self.page_records)
+            records.extend(self.page_records.pop(page))
+            self.released = page
+        return records
+
+
+class CategoryStateStore:
+    """Размер и время последнего обхода категорий для приоритизации полного обхода
+    
+    Больше страниц и дольше без обхода - выше приоритет. Категории, которые
+    еще не обходились, считаются устаревшими на max_age_hours.
+    """
+    
+    def __init__(self, path: Path, max_age_hours: float = 24 * 30):
+        self.path = path
+        self.max_age_hours = max_age_hours
+        self.categories: Dict[str, Dict[str, float]] = {}
+        self.load()
+    
+    def load(self):
+        """Загрузка состояния категорий"""
+        try:
+            if self.path.exists():
+                self.categories = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.categories = {}
+    
+    def save(self):
+        """Сохранение состояния категорий на диск"""
+        try:
+            self.path.parent.mkdir(exist_ok=True)
+            self.path.write_text(json.dumps(self.categories, ensure_ascii=False, indent=2), encoding='utf-8')
+        except OSError:
+            pass
+    
+    def expected_pages(self, url: str, default: float = 1) -> float:
+        """Число страниц категории в прошлом обходе"""
+        return self.categories.get(url, {}).get("pages", default)
+    
+    def score(self, url: str) -> float:
+        """Приоритет категории: страницы × часы с последнего обхода"""
+        state = self.categories.get(url)
+        if not state:
+            return self.max_age_hours
+        
+        age_hours = min((time.time() - state["crawled_at"]) / 3600, self.max_age_hours)
+        return max(state["pages"], 1) * (1 + age_hours)
+    
+    def record(self, url: str, pages: int, channels: int):
+        """Запоминание результата обхода категории"""
+        self.categories[url] = {"pages": pages, "channels": channels, "crawled_at": time.time()}
+
+
+class CrawlQueue:
+    """Приоритетная очередь задач (категория, страница) для полного обхода
+    
+    Задачи с большим приоритетом категории извлекаются раньше, внутри
+    категории - по возрастанию номера страницы. Отложенные задачи (повторы)
+    становятся доступны после своей паузы. Считает выполненные задачи для
+    оценки темпа.
+    """
+    
+    def __init__(self):
+        self.heap: List[Tuple[float, int, int, str]] = []
+        self.delayed: List[Tuple[float, float, int, str]] = []
+        self.counter = 0
+        self.done = 0
+        self.started = time.monotonic()
+    
+    def __len__(self) -> int:
+        return len(self.heap) + len(self.delayed)
+    
+    def push(self, score: float, url: str, page: int):
+        """Добавление задачи с приоритетом категории score"""
+        heapq.heappush(self.heap, (-score, page, self.counter, url))
+        self.counter += 1
+    
+    def push_later(self, delay: float, score: float, url: str, page: int):
+        """Добавление задачи, которая станет доступна через delay секунд"""
+        heapq.heappush(self.delayed, (time.monotonic() + delay, score, page, url))
+    
+    def pop_batch(self, size: int) -> List[Tuple[str, int]]:
+        """Извлечение до size задач с наибольшим приоритетом
+        
+        Если остались только отложенные задачи, ждет ближайшую из них.
+        """
+        if not self.heap and self.delayed:
+            pause = self.delayed[0][0] - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+        
+        while self.delayed and self.delayed[0][0] <= time.monotonic():
+            _, score, page, url = heapq.heappop(self.delayed)
+            self.push(score, url, page)
+        
+        batch = []
+        while self.heap and len(batch) < size:
+            _, page, _, url = heapq.heappop(self.heap)
+            batch.append((url, page))
+        return batch
+    
+    def rate(self) -> float:
+        """Выполнено задач в секунду с начала обхода"""
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+
+class JobStore:
+    """Общая очередь задач (категория, страница) в SQLite для нескольких процессов
+    
+    Координатор добавляет задачи и забирает результаты, воркеры берут задачи
+    в аренду (lease) и продлевают ее heartbeat-ами. Аренда, не продленная
+    вовремя (воркер убит или завис), возвращается в очередь. Режим WAL
+    позволяет читать, пока идет запись; для сетевых дисков, где WAL
+    недоступен, используется обычный журнал (wal=False).
+    """
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        url TEXT NOT NULL,
+        page INTEGER NOT NULL,
+        priority REAL NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        lease_expires REAL,
+        result TEXT,
+        last_page INTEGER,
+        reported INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (url, page)
+    );
+    CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority);
+    CREATE TABLE IF NOT EXISTS workers (
+        worker TEXT PRIMARY KEY,
+        heartbeat_at REAL NOT NULL,
+        pages INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value REAL NOT NULL
+    );
+    """
+    
+    def __init__(self, path: Path, lease_seconds: float = 120, max_attempts: int = 4, wal: bool = True):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA busy_timeout = 30000")
+        if wal:
+            self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(self.SCHEMA)
+        
+        # Очередь, созданная до появления last_page, дополняется столбцом
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(jobs)")}
+        if "last_page" not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN last_page INTEGER")
+    
+    @contextmanager
+    def write(self):
+        """Транзакция с блокировкой записи (BEGIN IMMEDIATE) для группы запросов"""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+    
+    def reset(self):
+        """Очистка очереди перед новым обходом; обходу присваивается новый run_id"""
+        with self.write() as connection:
+            for table in ("jobs", "workers", "meta"):
+                connection.execute(f"DELETE FROM {table}")
+            connection.execute("INSERT INTO meta (key, value) VALUES ('run_id', ?)", (time.time(),))
+    
+    def push(self, score: float, url: str, page: int):
+        """Добавление задачи (повторное добавление той же страницы игнорируется)"""
+        with self.write() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO jobs (url, page, priority, updated_at) VALUES (?, ?, ?, ?)",
+                (url, page, score, time.time())
+            )
+    
+    def claim(self, worker: str) -> Optional[Tuple[str, int]]:
+        """Аренда задачи с наибольшим приоритетом (None - свободных задач нет)"""
+        now = time.time()
+        with self.write() as connection:
+            row = connection.execute(
+                "SELECT url, page FROM jobs WHERE status = 'pending' ORDER BY priority DESC, page LIMIT 1"
+            ).fetchone()
+            if row:
+                connection.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE url = ? AND page = ?",
+                    (worker, now + self.lease_seconds, now, row[0], row[1])
+                )
+        return (row[0], row[1]) if row else None
+    
+    def heartbeat(self, worker: str, task: Optional[Tuple[str, int]] = None):
+        """Продление аренды текущей задачи и отметка, что воркер жив"""
+        now = time.time()
+        with self.write() as connection:
+            connection.execute("INSERT OR IGNORE INTO workers (worker, heartbeat_at) VALUES (?, ?)", (worker, now))
+            connection.execute("UPDATE workers SET heartbeat_at = ? WHERE worker = ?", (now, worker))
+            if task:
+                connection.execute(
+                    "UPDATE jobs SET lease_expires = ? WHERE url = ? AND page = ? AND worker = ? "
+                    "AND status = 'leased'",
+                    (now + self.lease_seconds, task[0], task[1], worker)
+                )
+    
+    def complete(self, worker: str, task: Tuple[str, int], records: Optional[List[Dict[str, str]]],
+                 last_page: Optional[int] = None) -> bool:
+        """Результат задачи от воркера (False - аренда уже потеряна)
+        
+        records=None - страница не получена: задача возвращается в очередь,
+        пока не исчерпаны попытки. last_page - граница листинга по пагинатору,
+        которую видел воркер (пагинатор разбирается только в его процессе).
+        """
+        now = time.time()
+        with self.write() as connection:
+            if records is not None:
+                cursor = connection.execute(
+                    "UPDATE jobs SET status = 'done', result = ?, last_page = ?, updated_at = ? "
+                    "WHERE url = ? AND page = ? AND worker = ? AND status = 'leased'",
+                    (json.dumps(records, ensure_ascii=False), last_page, now, task[0], task[1], worker)
+                )
+            else:
+                cursor = connection.execute(
+                    "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                    "worker = NULL, updated_at = ? "
+                    "WHERE url = ? AND page = ? AND worker = ? AND status = 'leased'",
+                    (self.max_attempts, now, task[0], task[1], worker)
+                )
+            
+            updated = cursor.rowcount > 0
+            if updated:
+                connection.execute("UPDATE workers SET pages = pages + 1 WHERE worker = ?", (worker,))
+        return updated
+    
+    def reclaim_expired(self) -> int:
+        """Возврат в очередь задач с истекшей арендой; возвращает их число"""
+        now = time.time()
+        with self.write() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, updated_at = ? WHERE status = 'leased' AND lease_expires < ?",
+                (self.max_attempts, now, now)
+            )
+        return cursor.rowcount
+    
+    def take_results(self) -> List[Tuple[str, int, Optional[List[Dict[str, str]]], Optional[int]]]:
+        """Новые результаты (url, страница, записи - None, если страница не получена, граница по пагинатору)"""
+        with self.write() as connection:
+            rows = connection.execute(
+                "SELECT url, page, result, last_page FROM jobs "
+                "WHERE status IN ('done', 'failed') AND reported = 0"
+            ).fetchall()
+            connection.executemany("UPDATE jobs SET reported = 1 WHERE url = ? AND page = ?",
+                                   [(url, page) for url, page, _, _ in rows])
+        return [(url, page, json.loads(result) if result is not None else None, last_page)
+                for url, page, result, last_page in rows]
+    
+    def counts(self) -> Dict[str, int]:
+        """Число задач по статусам"""
+        with self.lock:
+            rows = self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+    
+    def active_workers(self, window: float = 60) -> int:
+        """Число воркеров с heartbeat за последние window секунд"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT COUNT(*) FROM workers WHERE heartbeat_at > ?", (time.time() - window,)
+            ).fetchone()
+        return row[0]
+    
+    def set_finished(self):
+        """Отметка, что обход завершен и воркерам пора выходить"""
+        with self.write() as connection:
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('finished', 1)")
+    
+    def run_state(self) -> Tuple[Optional[float], bool]:
+        """Текущий обход: его run_id (None - координатор еще не запускался) и завершен ли он"""
+        with self.lock:
+            rows = dict(self.connection.execute(
+                "SELECT key, value FROM meta WHERE key IN ('run_id', 'finished')"
+            ).fetchall())
+        return rows.get("run_id"), bool(rows.get("finished"))
+    
+    def reserve_slot(self, interval: float) -> float:
+        """Общий для всех процессов потолок темпа: пауза до следующего слота"""
+        now = time.time()
+        with self.write() as connection:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'next_start'").fetchone()
+            start = max(now, row[0] if row else now)
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_start', ?)",
+                               (start + interval,))
+        return start - now
+    
+    def close(self):
+        """Закрытие соединения"""
+        with self.lock:
+            self.connection.close()
+
+
+class PageCache:
+    """Дисковый кэш HTTP-страниц с TTL, условной ревалидацией и LRU-вытеснением
+    
+    Для каждого URL хранится сжатое тело (<ключ>.html.gz) и метаданные
+    (<ключ>.json: ETag, Last-Modified, время загрузки). Порядок вытеснения
+    определяется временем последнего обращения к файлу тела. Общий размер
+    ведется в памяти; каталог просматривается только при превышении лимита,
+    и тогда записи удаляются пачкой до доли low_water от лимита.
+    """
+    
+    def __init__(self, directory: Path, ttl: float = 3600, max_bytes: int = 200 * 1024 * 1024,
+                 low_water: float = 0.9):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.total_bytes: Optional[int] = None
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "bytes_saved": 0}
+    
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        """Пути к телу и метаданным для URL"""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.html.gz", self.directory / f"{key}.json"
+    
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """Время обращения, размер и путь тела для всех записей каталога"""
+        entries = []
+        for path in self.directory.glob("*.html.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def get(self, url: str) -> Optional[Tuple[str, Dict[str, object]]]:
+        """Тело и метаданные из кэша (без учета TTL)"""
+        body_path, meta_path = self._paths(url)
+        
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = gzip.decompress(body_path.read_bytes()).decode("utf-8")
+            os.utime(body_path)
+        except (OSError, ValueError):
+            return None
+        
+        return body, meta
+    
+    def is_fresh(self, meta: Dict[str, object]) -> bool:
+        """Запись моложе TTL"""
+        return time.time() - float(meta.get("fetched_at", 0)) < self.ttl
+    
+    def record_hit(self, body: str, revalidated: bool = False):
+        """Учет ответа, обслуженного из кэша"""
+        self.stats["revalidated" if revalidated else "hits"] += 1
+        self.stats["bytes_saved"] += len(body.encode("utf-8"))
+    
+    def _write_meta(self, meta_path: Path, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """Запись метаданных с текущим временем загрузки"""
+        meta_path.write_text(json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }), encoding="utf-8")
+    
+    def put(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Сохранение страницы в кэш"""
+        body_path, meta_path = self._paths(url)
+        data = gzip.compress(body.encode("utf-8"))
+        
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            try:
+                old_size = body_path.stat().st_size
+            except OSError:
+                old_size = 0
+            body_path.write_bytes(data)
+            self._write_meta(meta_path, url, etag, last_modified)
+        except OSError:
+            return
+        
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self.total_bytes += len(data) - old_size
+            over_limit = self.total_bytes > self.max_bytes
+        
+        if over_limit:
+            self.evict()
+    
+    def touch(self, url: str):
+        """Продление TTL записи после ответа 304 Not Modified (тело не перезаписывается)"""
+        body_path, meta_path = self._paths(url)
+        
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            self._write_meta(meta_path, url, meta.get("etag"), meta.get("last_modified"))
+            os.utime(body_path)
+        except (OSError, ValueError):
+            pass
+    
+    def evict(self):
+        """Удаление давно не использованных записей до low_water от лимита размера"""
+        with self.lock:
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * self.low_water if total > self.max_bytes else self.max_bytes
+            
+            for _, size, body_path in sorted(entries):
+                if total <= target:
+                    break
+                meta_path = body_path.with_name(body_path.name[:-len(".html.gz")] + ".json")
+                for path in (body_path, meta_path):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+                total -= size
+            
+            self.total_bytes = total
+    
+    def conditional_headers(self, meta: Dict[str, object]) -> Dict[str, str]:
+        """Заголовки условного запроса для ревалидации"""
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = str(meta["etag"])
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = str(meta["last_modified"])
+        return headers
+
+
+class HttpFetcher:
+    """Загрузка страниц через общий requests.Session без браузера
+    
+    Соединения переиспользуются (keep-alive), ответы запрашиваются сжатыми.
+    Страницы проверки и ошибки возвращаются как None - в этом случае
+    вызывающий код переходит на Selenium, 404 - как пустая строка (страницы
+    нет, браузер не нужен). При наличии кэша свежие страницы
+    отдаются с диска, устаревшие ревалидируются условным запросом.
+    """
+    
+    def __init__(self, user_agent: str, timeout: float = 15, pool_size: int = 10,
+                 cache: Optional[PageCache] = None):
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        
+        self.stats = {"requests": 0, "challenges": 0, "errors": 0, "bytes": 0}
+    
+    def fetch(self, url: str) -> Optional[str]:
+        """Загрузка HTML страницы (None - нужен браузер, пустая строка - страницы нет, 404)"""
+        cached = self.cache.get(url) if self.cache else None
+        if cached and self.cache.is_fresh(cached[1]):
+            self.cache.record_hit(cached[0])
+            return cached[0]
+        
+        headers = self.cache.conditional_headers(cached[1]) if cached else {}
+        self.stats["requests"] += 1
+        
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException:
+            self.stats["errors"] += 1
+            return None
+        
+        self.stats["bytes"] += len(response.content)
+        
+        if response.status_code == 304 and cached:
+            self.cache.touch(url)
+            self.cache.record_hit(cached[0], revalidated=True)
+            return cached[0]
+        
+        if is_challenge_page(response.text, response.status_code):
+            self.stats["challenges"] += 1
+            return None
+        
+        # Страница за концом листинга: разметка пригодна, карточек нет
+        if response.status_code == 404:
+            return ""
+        
+        if response.status_code != 200:
+            self.stats["errors"] += 1
+            return None
+        
+        if self.cache:
+            self.cache.stats["misses"] += 1
+            self.cache.put(url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        
+        return response.text
+    
+    def adopt_browser_session(self, driver):
+        """Перенос cookies и User-Agent из браузера, прошедшего проверку"""
+        try:
+            self.session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+            for cookie in driver.get_cookies():
+                self.session.cookies.set(cookie["name"], cookie["value"],
+                                         domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        except Exception:
+            pass
+
+
+class PacingController:
+    """Адаптивный темп запросов по схеме AIMD
+    
+    delay - интервал между началами запросов (общий для всех потоков),
+    concurrency - допустимое число одновременных запросов. Успешные быстрые
+    ответы аддитивно уменьшают интервал и увеличивают параллельность, ошибки
+    и страницы проверки мультипликативно замедляют обход. Темп не превышает
+    max_rate страниц в минуту.
+    """
+    
+    def __init__(self, initial_delay: float = 6.0, max_delay: float = 60.0, max_rate: float = 30.0,
+                 additive_step: float = 0.5, backoff_factor: float = 2.0, slow_latency: float = 10.0,
+                 max_concurrency: int = 8):
+        self.delay = initial_delay
+        self.max_delay = max_delay
+        self.max_rate = max_rate
+        self.additive_step = additive_step
+        self.backoff_factor = backoff_factor
+        self.slow_latency = slow_latency
+        self.max_concurrency = max_concurrency
+        self.concurrency = 1
+        self.successes = 0
+        self.next_start = 0.0
+        self.lock = threading.Lock()
+    
+    @property
+    def min_delay(self) -> float:
+        """Минимальный интервал, задаваемый потолком темпа"""
+        return 60.0 / self.max_rate
+    
+    def set_max_rate(self, max_rate: float):
+        """Новый потолок темпа; текущий интервал не становится меньше допустимого"""
+        if max_rate <= 0:
+            raise ValueError("потолок темпа должен быть положительным")
+        with self.lock:
+            self.max_rate = max_rate
+            self.delay = max(self.min_delay, self.delay)
+    
+    def rate(self) -> float:
+        """Текущий целевой темп, страниц в минуту"""
+        return 60.0 / self.delay
+    
+    def reserve(self) -> float:
+        """Резервирование следующего слота; возвращает паузу до него в секундах"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.delay * random.uniform(0.9, 1.1)
+            return start - now
+    
+    def wait(self):
+        """Пауза до следующего разрешенного запроса"""
+        pause = self.reserve()
+        if pause > 0:
+            time.sleep(pause)
+    
+    def on_success(self, latency: float):
+        """Аддитивное ускорение после успешного ответа (или замедление при медленном)"""
+        with self.lock:
+            if latency > self.slow_latency:
+                self.delay = min(self.max_delay, self.delay * 1.5)
+                return
+            
+            self.delay = max(self.min_delay, self.delay - self.additive_step)
+            self.successes += 1
+            if self.successes >= self.concurrency:
+                self.successes = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+    
+    def on_failure(self):
+        """Мультипликативное замедление после ошибки или страницы проверки"""
+        with self.lock:
+            self.delay = min(self.max_delay, self.delay * self.backoff_factor)
+            self.concurrency = max(1, self.concurrency // 2)
+            self.successes = 0
+
+
+class AsyncCrawler:
+    """Асинхронный обход страниц листинга через httpx
+    
+    Задачи (category_url, page) выполняются параллельно с общим лимитом
+    concurrency и отдельным лимитом на хост. Разбор HTML выполняется в пуле
+    потоков, чтобы не блокировать цикл событий. Страницы проверки и ошибки
+    загрузки возвращаются как None, пригодная разметка без карточек (и 404
+    за концом листинга) - как пустой список.
+    
+    Цикл событий и AsyncClient (с его пулом соединений) живут между вызовами
+    run() и закрываются в close().
+    """
+    
+    def __init__(self, user_agent: str, concurrency: int = 8, per_host: int = 4, timeout: float = 15,
+                 pacer: Optional[PacingController] = None, cache: Optional[PageCache] = None):
+        self.user_agent = user_agent
+        self.cache = cache
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.pacer = pacer
+        self.active = 0
+        self.slots: Optional["asyncio.Condition"] = None
+        self.loop: Optional["asyncio.AbstractEventLoop"] = None
+        self.client = None
+        self.stats = {"ok": 0, "failed": 0, "elapsed": 0.0}
+    
+    @staticmethod
+    def page_url(url: str, page: int) -> str:
+        """URL страницы листинга"""
+        return f"{url}?page={page}" if page > 1 else url
+    
+    async def _crawl_task(self, client, url: str, page: int, limit: "asyncio.Semaphore",
+                          host_limits: Dict[str, "asyncio.Semaphore"]) -> Optional[List[Dict[str, str]]]:
+        """Загрузка и разбор одной страницы"""
+        page_url = self.page_url(url, page)
+        host_limit = host_limits.setdefault(urlparse(page_url).netloc, asyncio.Semaphore(self.per_host))
+        loop = asyncio.get_running_loop()
+        
+        cached = self.cache.get(page_url) if self.cache else None
+        if cached and self.cache.is_fresh(cached[1]):
+            self.cache.record_hit(cached[0])
+            records = await loop.run_in_executor(None, extract_channels_from_html, cached[0])
+            self.stats["ok"] += 1
+            return records
+        
+        async with limit, host_limit:
+            # Параллельность и интервал между запросами задает регулятор темпа
+            async with self.slots:
+                await self.slots.wait_for(lambda: self.pacer is None or self.active < self.pacer.concurrency)
+                self.active += 1
+            
+            try:
+                if self.pacer is not None:
+                    await asyncio.sleep(self.pacer.reserve())
+                
+                headers = self.cache.conditional_headers(cached[1]) if cached else {}
+                start_time = time.perf_counter()
+                response = await client.get(page_url, headers=headers)
+                latency = time.perf_counter() - start_time
+            except httpx.HTTPError:
+                self.stats["failed"] += 1
+                if self.pacer is not None:
+                    self.pacer.on_failure()
+                return None
+            finally:
+                async with self.slots:
+                    self.active -= 1
+                    self.slots.notify_all()
+        
+        if response.status_code == 304 and cached:
+            self.cache.touch(page_url)
+            self.cache.record_hit(cached[0], revalidated=True)
+            body = cached[0]
+        elif response.status_code == 404:
+            # Страница за концом листинга
+            self.stats["ok"] += 1
+            if self.pacer is not None:
+                self.pacer.on_success(latency)
+            return []
+        elif response.status_code != 200 or is_challenge_page(response.text, response.status_code):
+            self.stats["failed"] += 1
+            if self.pacer is not None:
+                self.pacer.on_failure()
+            return None
+        else:
+            body = response.text
+            if self.cache:
+                self.cache.stats["misses"] += 1
+                self.cache.put(page_url, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        
+        if self.pacer is not None:
+            self.pacer.on_success(latency)
+        
+        records = await loop.run_in_executor(None, extract_channels_from_html, body)
+        self.stats["ok"] += 1
+        return records
+    
+    async def crawl(self, tasks: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[List[Dict[str, str]]]]:
+        """Параллельный обход списка задач (category_url, page)"""
+        limit = asyncio.Semaphore(self.concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        
+        if self.slots is None:
+            self.slots = asyncio.Condition()
+        
+        if self.client is None:
+            headers = {
+                "User-Agent": self.user_agent,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+            }
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            self.client = httpx.AsyncClient(headers=headers, limits=limits, timeout=self.timeout,
+                                            follow_redirects=True)
+        
+        results = await asyncio.gather(*(
+            self._crawl_task(self.client, url, page, limit, host_limits) for url, page in tasks
+        ))
+        return dict(zip(tasks, results))
+    
+    def run(self, tasks: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[List[Dict[str, str]]]]:
+        """Синхронная обертка над crawl() в постоянном цикле событий"""
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+        
+        start_time = time.perf_counter()
+        results = self.loop.run_until_complete(self.crawl(tasks))
+        self.stats["elapsed"] += time.perf_counter() - start_time
+        return results
+    
+    def close(self):
+        """Закрытие AsyncClient и цикла событий"""
+        if self.loop is None:
+            return
+        
+        try:
+            if self.client is not None:
+                self.loop.run_until_complete(self.client.aclose())
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        finally:
+            self.loop.close()
+            self.loop = None
+            self.client = None
+            self.slots = None
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Экспоненциальная задержка повтора с джиттером (половина интервала случайна)"""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def format_result_line(index: int, channel: Dict[str, str]) -> str:
+    """Строка файла результатов"""
+    return f"{index}. {channel['name']} | {channel['url']} | {channel['subscribers']}\n"
+
+
+class CrawlCheckpoint:
+    """Контрольная точка долгого обхода
+    
+    Записи дописываются в файл <результаты>.part по мере получения страниц,
+    затем атомарно обновляется JSON контрольной точки: очередь страниц,
+    число выданных записей (offset) и размер .part, состояние дедупликации.
+    При возобновлении .part обрезается до сохраненного размера, поэтому
+    записи, выданные после последней контрольной точки, не дублируются.
+    """
+    
+    def __init__(self, path: Path, state: Dict):
+        self.path = path
+        self.state = state
+    
+    @classmethod
+    def start(cls, path: Path, **fields) -> "CrawlCheckpoint":
+        """Новая контрольная точка (существующая перезаписывается)"""
+        checkpoint = cls(path, dict(fields, offset=0, part_bytes=0))
+        if checkpoint.state.get("part"):
+            Path(checkpoint.state["part"]).write_bytes(b"")
+        checkpoint.save()
+        return checkpoint
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional["CrawlCheckpoint"]:
+        """Сохраненная контрольная точка (None - нет или повреждена)"""
+        try:
+            return cls(path, json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            return None
+    
+    def save(self, **fields):
+        """Атомарная запись состояния"""
+        self.state.update(fields)
+        self.state["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.parent.mkdir(exist_ok=True)
+        temp_path.write_text(json.dumps(self.state, ensure_ascii=False), encoding='utf-8')
+        os.replace(temp_path, self.path)
+    
+    def restore_output(self):
+        """Обрезка .part до размера на момент последней контрольной точки"""
+        if self.state.get("part"):
+            with open(self.state["part"], 'ab') as f:
+                f.truncate(self.state["part_bytes"])
+    
+    def append(self, records: List[Dict[str, str]]):
+        """Дописывание записей в .part (offset и размер сохраняются в save)"""
+        if not records or not self.state.get("part"):
+            return
+        
+        with open(self.state["part"], 'a', encoding='utf-8') as f:
+            for index, channel in enumerate(records, self.state["offset"] + 1):
+                f.write(format_result_line(index, channel))
+            f.flush()
+            os.fsync(f.fileno())
+            self.state["part_bytes"] = f.tell()
+        self.state["offset"] += len(records)
+    
+    def finalize(self) -> Optional[Path]:
+        """Итоговый файл результатов из .part; контрольная точка удаляется"""
+        part = Path(self.state["part"]) if self.state.get("part") else None
+        final_path = None
+        
+        if part and self.state["offset"]:
+            final_path = part.with_suffix("")
+            with open(final_path, 'w', encoding='utf-8') as f:
+                f.write("# TGStat.ru Parser Results\n")
+                f.write(f"# Дата: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"# Всего найдено: {self.state['offset']}\n\n")
+                with open(part, 'r', encoding='utf-8') as part_file:
+                    for line in part_file:
+                        f.write(line)
+        
+        self.discard()
+        return final_path
+    
+    def discard(self):
+        """Удаление контрольной точки и .part"""
+        for path in (self.path, Path(self.state["part"]) if self.state.get("part") else None):
+            try:
+                if path:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+class CircuitBreaker:
+    """Размыкатель цепи для обхода страниц
+    
+    Если доля ошибок в последних window исходах достигает порога, обход
+    приостанавливается на cooldown секунд. Затем следующая страница служит
+    пробой: успех замыкает цепь, ошибка снова размыкает.
+    """
+    
+    def __init__(self, window: int = 10, failure_threshold: float = 0.5,
+                 min_samples: int = 4, cooldown: float = 60):
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.outcomes: deque = deque(maxlen=window)
+        self.state = "closed"
+        self.trips = 0
+        self.open_time = 0.0
+    
+    def failure_rate(self) -> float:
+        """Доля ошибок в окне"""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+    
+    def record(self, success: bool) -> bool:
+        """Учет исхода страницы; возвращает True, если цепь разомкнулась"""
+        if self.state == "half_open":
+            if success:
+                self.outcomes.clear()
+                self.state = "closed"
+                return False
+            self.outcomes.append(False)
+            self.state = "open"
+            self.trips += 1
+            return True
+        
+        self.outcomes.append(success)
+        if len(self.outcomes) >= self.min_samples and self.failure_rate() >= self.failure_threshold:
+            self.state = "open"
+            self.trips += 1
+            return True
+        return False
+    
+    def wait_if_open(self, logger: logging.Logger):
+        """Пауза, пока цепь разомкнута; после нее разрешается одна проба"""
+        if self.state != "open":
+            return
+        
+        logger.warning(f"🔌 Слишком много ошибок ({self.failure_rate():.0%}), пауза {self.cooldown:.0f}с")
+        time.sleep(self.cooldown)
+        self.open_time += self.cooldown
+        self.state = "half_open"
+        logger.info("🔌 Пробная страница после паузы")
+
+
+class BrowserWatchdog:
+    """Контроль памяти и числа обслуженных страниц одной сессии браузера
+    
+    Когда RSS дерева процессов Chrome или число страниц превышает порог,
+    сессию нужно перезапустить между страницами. Пороги 0 отключают проверку.
+    """
+    
+    def __init__(self, max_rss_mb: int = 1500, max_pages: int = 200):
+        self.max_rss_mb = max_rss_mb
+        self.max_pages = max_pages
+        self.pages = 0
+        self.restarts = 0
+        self.high_water = 0
+    
+    def page_served(self, driver) -> Optional[str]:
+        """Учет страницы; возвращает причину перезапуска или None"""
+        self.pages += 1
+        rss = get_browser_rss(driver)
+        
+        if rss:
+            self.high_water = max(self.high_water, rss)
+            if self.max_rss_mb and rss > self.max_rss_mb * 1024 * 1024:
+                return f"RSS {rss / 1024 / 1024:.0f} МБ > {self.max_rss_mb} МБ"
+        
+        if self.max_pages and self.pages >= self.max_pages:
+            return f"обслужено {self.pages} страниц"
+        
+        return None
+    
+    def restarted(self):
+        """Учет перезапуска сессии"""
+        self.restarts += 1
+        self.pages = 0
+    
+    def merge(self, other: "BrowserWatchdog"):
+        """Добавление статистики другой сессии (воркера пула)"""
+        self.restarts += other.restarts
+        self.high_water = max(self.high_water, other.high_water)
 
 
 class TGStatParser:
     """Основной класс парсера TGStat.ru для Windows"""
     
-    def __init__(self):
-        """Инициализация парсера"""
-        self.base_url = "https://tgstat.ru"
-        self.driver = None
-        self.results_dir = Path("results")
-        self.logs_dir = Path("logs")
-        self.driver_dir = Path("drivers")
-        
-        # Создание необходимых директорий
-        for directory in [self.results_dir, self.logs_dir, self.driver_dir]:
-            directory.mkdir(exist_ok=True)
+    def __init__(self):
+        """Инициализация парсера"""
+        self.base_url = "https://tgstat.ru"
+        self.driver = None
+        self.results_dir = Path("results")
+        self.logs_dir = Path("logs")
+        self.driver_dir = Path("drivers")
+        self.driver_manifest_path = self.driver_dir / "manifest.json"
+        self.cache_dir = Path("cache")
+        
+        # Директории и файл лога создаются при первом обходе (prepare_workspace)
+        self.workspace_ready = False
+        
+        # Проверка соединения выполняется в фоне и не задерживает меню
+        self.connection_ok: Optional[bool] = None
+        self.connection_thread: Optional[threading.Thread] = None
+        
+        # Настройка логирования
+        self.setup_logging()
+        
+        # User agents для ротации
+        self.user_agents = [
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+        ]
+        
+        # Способ извлечения: "script" - один JS-запрос на страницу, "elements" - обход элементов,
+        # "html" - разбор page_source через lxml без обращений к элементам
+        self.extraction_mode = "script"
+        self.compare_extraction = False
+        self.extraction_timings: Dict[str, List[float]] = {}
+        
+        # Способ загрузки страниц: "http" - requests.Session с переходом на Selenium
+        # при проверке Cloudflare или непригодной разметке, "async" - параллельный
+        # обход через httpx, "selenium" - только браузер
+        self.fetch_backend = "http"
+        self.async_concurrency = 8
+        self.async_per_host = 4
+        self.http_fetcher: Optional[HttpFetcher] = None
+        # Клиент httpx и цикл событий живут весь обход (закрывает close_async_crawler())
+        self.async_crawler: Optional[AsyncCrawler] = None
+        
+        # Категории, листинг которых уже приходил с карточками без браузера: для них
+        # пустая HTTP-страница означает конец листинга, а не JS-отрисовку
+        self.http_listings = set()
+        
+        self.fetch_stats = {"http": 0, "browser": 0}
+        
+        # Счетчик обходов за время жизни прогретой сессии
+        self.crawl_count = 0
+        
+        # Автопагинация: обход идет до пустой или повторной страницы, но не дальше
+        # auto_max_pages (если число не задано). Пагинатор дает нижнюю границу числа
+        # страниц (pager_hints): их полный обход ставит в очередь сразу.
+        # Следующая страница загружается по HTTP, пока обрабатывается текущая
+        self.auto_max_pages = 100
+        self.prefetch_pages = True
+        self.pager_hints: Dict[str, int] = {}
+        self.prefetched: Dict[str, Future] = {}
+        self.prefetch_executor: Optional[ThreadPoolExecutor] = None
+        self.pagination_stats = {"pages": 0, "wasted": 0, "prefetched": 0, "trimmed": 0}
+        
+        # Инкрементальный обход: выдаются только новые и изменившиеся каналы,
+        # категория завершается после incremental_stop_pages страниц подряд,
+        # на которых все каналы уже известны по прошлым запускам
+        self.incremental = False
+        self.incremental_stop_pages = 2
+        self.known_channels: Optional[KnownChannelsStore] = None
+        self.incremental_stats = {"new": 0, "changed": 0, "unchanged": 0, "pages_saved": 0}
+        
+        # Полный обход: все категории каналов и чатов через приоритетную очередь
+        self.category_state: Optional[CategoryStateStore] = None
+        
+        # Контрольная точка долгого обхода (для --resume) и частота ее записи в страницах
+        self.checkpoint_path = self.cache_dir / "checkpoint.json"
+        self.checkpoint_every = 1
+        
+        # Распределенный обход: опрос общей очереди и период отчета координатора
+        self.coordinator_poll = 1.0
+        self.coordinator_report_interval = 30.0
+        
+        # Темп задается общим слотом очереди (воркер), локальная пауза не нужна
+        self.shared_pacing = False
+        
+        # Профиль браузера: "full" - окно 1920x1080, "headless" - без окна
+        # с блокировкой второстепенных ресурсов через CDP
+        self.browser_profile = "full"
+        self.profile_stats: Dict[str, List[Dict[str, float]]] = {}
+        
+        # Восстановление после падения Chrome/ChromeDriver
+        self.max_page_attempts = 2
+        self.crash_stats = {"restarts": 0, "requeued": 0}
+        
+        # Адаптивный темп запросов вместо фиксированных случайных пауз
+        self.pacer = PacingController()
+        
+        # Повтор неудачных страниц с экспоненциальной задержкой и размыкатель цепи
+        self.max_page_retries = 3
+        self.retry_base_delay = 10
+        self.retry_max_delay = 300
+        self.circuit_breaker = CircuitBreaker()
+        self.retry_stats = {"retries": 0, "recovered": 0, "abandoned": 0}
+        
+        # Перезапуск Chrome при росте памяти или после заданного числа страниц
+        self.watchdog = BrowserWatchdog()
+        
+        # Пул WebDriver-сессий для параллельной загрузки через Selenium (1 - без пула).
+        # Сессии живут весь обход и закрываются close_driver_pool()
+        self.driver_pool_size = 1
+        self.driver_pool: List["TGStatParser"] = []
+        
+        # Несколько вкладок в одной сессии Chrome (1 - одна вкладка)
+        self.tab_count = 1
+        self.browser_mode_stats: Dict[str, Dict[str, float]] = {}
+        
+        # Дисковый кэш HTTP-страниц (TTL, ETag/Last-Modified, LRU по размеру)
+        self.page_cache_enabled = True
+        self.page_cache_dir = self.cache_dir / "pages"
+        self.page_cache_ttl = 3600
+        self.page_cache_max_mb = 200
+        self.page_cache: Optional[PageCache] = None
+        
+        # Кэш списка категорий
+        self.category_cache_ttl = 24 * 3600
+        self.category_refreshes = set()
+        
+        # Захват XHR/JSON ответов листинга через Chrome DevTools (performance log)
+        self.capture_network = False
+        self.network_capture_stats = {"network": 0, "dom": 0}
+        
+        # Ожидание готовности страницы по условиям вместо фиксированных пауз
+        self.page_ready_timeout = 30
+        self.page_ready_poll = 0.2
+        self.page_wait_times: List[float] = []
+        
+        # Прокрутка до стабилизации числа карточек вместо фиксированной паузы
+        self.harvest_quiet_ms = 500
+        self.harvest_max_wait_ms = 3000
+        self.harvest_max_steps = 30
+        self.harvest_stats: List[Dict[str, object]] = []
+        
+        # Кэш сработавших селекторов для страниц каналов и категорий
+        self.selector_cache = SelectorCache(self.cache_dir / "selectors.json")
+        
+        self.logger.info("🚀 TGStat Parser инициализирован для Windows")
+    
+    def setup_logging(self):
+        """Настройка системы логирования (файловый лог подключается в prepare_workspace)"""
+        # Настройка форматтера
+        self.log_formatter = logging.Formatter(
+            '%(asctime)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        
+        # Консольный хендлер
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(self.log_formatter)
+        console_handler.setLevel(logging.INFO)
+        
+        # Настройка логгера
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(console_handler)
+        
+        # Отключаем лишние логи Selenium
+        selenium_logger = logging.getLogger('selenium')
+        selenium_logger.setLevel(logging.WARNING)
+    
+    def prepare_workspace(self):
+        """Создание рабочих директорий и файла лога перед первым обходом"""
+        if self.workspace_ready:
+            return
+        
+        for directory in [self.results_dir, self.logs_dir, self.driver_dir, self.cache_dir]:
+            directory.mkdir(exist_ok=True)
+        
+        # Файловый хендлер
+        log_file = self.logs_dir / f"tgstat_parser_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(self.log_formatter)
+        file_handler.setLevel(logging.DEBUG)
+        self.logger.addHandler(file_handler)
+        
+        self.workspace_ready = True
+    
+    def start_connection_check(self):
+        """Фоновая проверка интернет соединения"""
+        def run():
+            self.connection_ok = self.check_internet_connection()
+        
+        self.connection_thread = threading.Thread(target=run, name="connection-check", daemon=True)
+        self.connection_thread.start()
+    
+    def wait_for_connection(self, timeout: float = 10) -> bool:
+        """Результат фоновой проверки соединения (True, если проверка не запускалась)"""
+        if self.connection_thread is None:
+            return True
+        
+        self.connection_thread.join(timeout)
+        if self.connection_ok is False:
+            print("❌ Отсутствует интернет соединение")
+        return self.connection_ok is not False
+    
+    def check_internet_connection(self) -> bool:
+        """Проверка интернет соединения"""
+        try:
+            self.logger.info("🌐 Проверка интернет соединения...")
+            response = requests.get("https://google.com", timeout=5)
+            if response.status_code == 200:
+                self.logger.info("✅ Интернет соединение установлено")
+                return True
+        except requests.RequestException as e:
+            self.logger.error(f"❌ Нет интернет соединения: {e}")
+            return False
+        return False
+    
+    def get_chrome_version(self) -> Optional[str]:
+        """Получение мажорной версии Chrome (Windows, Linux, macOS)"""
+        try:
+            version = self.get_chrome_version_windows() if os.name == "nt" else self.get_chrome_version_posix()
+            if version:
+                return version
+            
+            self.logger.warning("⚠️ Не удалось определить версию Chrome автоматически")
+            return "120"  # Версия по умолчанию
+            
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка при определении версии Chrome: {e}")
+            return "120"
+    
+    def get_chrome_version_windows(self) -> Optional[str]:
+        """Получение версии Chrome в Windows через wmic"""
+        # Различные пути установки Chrome в Windows
+        chrome_paths = [
+            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+            r"C:\Users\{username}\AppData\Local\Google\Chrome\Application\chrome.exe".format(
+                username=os.getenv('USERNAME', '')
+            )
+        ]
+        
+        for chrome_path in chrome_paths:
+            if os.path.exists(chrome_path):
+                try:
+                    # Получаем версию через wmic
+                    result = subprocess.run([
+                        'wmic', 'datafile', 'where', f'name="{chrome_path.replace(chr(92), chr(92)+chr(92))}"',
+                        'get', 'Version', '/value'
+                    ], capture_output=True, text=True, timeout=10)
+                    
+                    if result.returncode == 0:
+                        for line in result.stdout.strip().split('\n'):
+                            if line.startswith('Version='):
+                                version = line.split('=')[1].strip()
+                                major_version = version.split('.')[0]
+                                self.logger.info(f"🔍 Найдена версия Chrome: {version} (мажорная: {major_version})")
+                                return major_version
+                except Exception as e:
+                    self.logger.debug(f"Не удалось получить версию через wmic: {e}")
+                    continue
+        
+        return None
+    
+    def get_chrome_version_posix(self) -> Optional[str]:
+        """Получение версии Chrome/Chromium в Linux и macOS через --version"""
+        for binary in CHROME_BINARIES_POSIX:
+            try:
+                result = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10)
+            except (OSError, subprocess.SubprocessError):
+                continue
+            
+            match = re.search(r'(\d+)\.[\d.]+', result.stdout)
+            if result.returncode == 0 and match:
+                self.logger.info(f"🔍 Найдена версия Chrome: {match.group(0)} (мажорная: {match.group(1)})")
+                return match.group(1)
+        
+        return None
+    
+    def get_chromedriver_candidates(self, version: str) -> List[str]:
+        """Адреса архивов ChromeDriver для версии и платформы (в порядке приоритета)"""
+        platform_name = chrome_platform()
+        legacy_platform = {"win64": "win32", "linux64": "linux64",
+                           "mac-x64": "mac64", "mac-arm64": "mac_arm64"}[platform_name]
+        download_urls = []
+        
+        # Для Chrome 115+ используем новый формат (Chrome for Testing)
+        if int(version) >= 115:
+            download_urls.extend([
+                f"https://edgedl.me.gvt1.com/edgedl/chrome/chrome-for-testing/{version}.0.0.0/{platform_name}/chromedriver-{platform_name}.zip",
+                f"https://edgedl.me.gvt1.com/edgedl/chrome/chrome-for-testing/{version}.0.6312.62/{platform_name}/chromedriver-{platform_name}.zip",
+                f"https://edgedl.me.gvt1.com/edgedl/chrome/chrome-for-testing/stable/{platform_name}/chromedriver-{platform_name}.zip"
+            ])
+        
+        # Для старых версий Chrome используем старый API
+        download_urls.extend([
+            f"https://chromedriver.storage.googleapis.com/{version}.0.0.0/chromedriver_{legacy_platform}.zip",
+            f"https://chromedriver.storage.googleapis.com/114.0.5735.90/chromedriver_{legacy_platform}.zip",
+            f"https://chromedriver.storage.googleapis.com/113.0.5672.63/chromedriver_{legacy_platform}.zip"
+        ])
+        return download_urls
+    
+    def lookup_chrome_for_testing(self, version: str) -> Optional[str]:
+        """Адрес ChromeDriver для мажорной версии из JSON Chrome for Testing"""
+        try:
+            response = requests.get(CHROME_FOR_TESTING_MILESTONES_URL, timeout=10)
+            response.raise_for_status()
+            downloads = response.json()["milestones"][version]["downloads"]["chromedriver"]
+        except (requests.RequestException, KeyError, ValueError):
+            return None
+        
+        for download in downloads:
+            if download.get("platform") == chrome_platform():
+                return download.get("url")
+        return None
+    
+    def download_chromedriver(self, version: str) -> Optional[str]:
+        """Скачивание ChromeDriver для текущей платформы"""
+        try:
+            self.logger.info(f"📥 Скачивание ChromeDriver версии {version}...")
+            
+            download_urls = self.get_chromedriver_candidates(version)
+            
+            def probe(url: str) -> bool:
+                try:
+                    return requests.head(url, timeout=10).status_code == 200
+                except requests.RequestException:
+                    return False
+            
+            # Все кандидаты проверяются одновременно, выбирается первый по приоритету
+            with ThreadPoolExecutor(max_workers=len(download_urls) + 1) as executor:
+                milestone_future = executor.submit(self.lookup_chrome_for_testing, version)
+                probe_futures = [(url, executor.submit(probe, url)) for url in download_urls]
+                
+                versions_url = milestone_future.result()
+                if not versions_url:
+                    versions_url = next((url for url, future in probe_futures if future.result()), None)
+            
+            if not versions_url:
+                # Если ничего не работает, используем последний стабильный
+                versions_url = download_urls[-2]
+            
+            # Скачиваем ChromeDriver в папку версии
+            target_dir = self.driver_dir / version
+            target_dir.mkdir(parents=True, exist_ok=True)
+            driver_zip = target_dir / "chromedriver.zip"
+            
+            self.logger.info(f"🔗 URL для скачивания: {versions_url}")
+            
+            response = requests.get(versions_url, stream=True, timeout=30)
+            response.raise_for_status()
+            
+            with open(driver_zip, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+            
+            # Извлекаем архив
+            with zipfile.ZipFile(driver_zip, 'r') as zip_ref:
+                zip_ref.extractall(target_dir)
+            
+            # Удаляем архив
+            driver_zip.unlink()
+            
+            # Ищем исполняемый файл
+            driver_paths = list(target_dir.rglob(chromedriver_filename()))
+            if driver_paths:
+                driver_path = driver_paths[0]
+                if os.name != "nt":
+                    driver_path.chmod(driver_path.stat().st_mode | 0o111)
+                self.logger.info(f"✅ ChromeDriver загружен: {driver_path}")
+                return str(driver_path)
+            
+            self.logger.error("❌ ChromeDriver не найден после извлечения")
+            return None
+            
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка при загрузке ChromeDriver: {e}")
+            return None
+    
+    def load_driver_manifest(self) -> Optional[Dict[str, object]]:
+        """Манифест разрешенного ChromeDriver (None - нет или файл изменился)"""
+        try:
+            manifest = json.loads(self.driver_manifest_path.read_text(encoding='utf-8'))
+            driver_path = Path(manifest["driver_path"])
+            stat = driver_path.stat()
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        # Быстрая проверка без хеширования; при расхождении сверяется контрольная сумма
+        if stat.st_size != manifest.get("size") or stat.st_mtime != manifest.get("mtime"):
+            if file_sha256(driver_path) != manifest.get("sha256"):
+                return None
+        
+        return manifest
+    
+    def save_driver_manifest(self, browser_version: str, driver_path: str):
+        """Запись версии браузера, пути и контрольной суммы драйвера"""
+        path = Path(driver_path)
+        stat = path.stat()
+        manifest = {
+            "browser_version": browser_version,
+            "driver_path": str(path),
+            "sha256": file_sha256(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "platform": chrome_platform(),
+            "resolved_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.driver_manifest_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    
+    def invalidate_driver_manifest(self):
+        """Сброс манифеста (например, после обновления Chrome)"""
+        try:
+            self.driver_manifest_path.unlink()
+        except OSError:
+            pass
+    
+    def resolve_chromedriver(self, use_manifest: bool = True, allow_download: bool = True) -> Optional[str]:
+        """Поиск ChromeDriver: манифест, затем папка drivers/, затем загрузка"""
+        start_time = time.perf_counter()
+        
+        manifest = self.load_driver_manifest() if use_manifest else None
+        if manifest:
+            self.logger.info(
+                f"📁 ChromeDriver из манифеста: {manifest['driver_path']} "
+                f"({time.perf_counter() - start_time:.3f}с)"
+            )
+            return str(manifest["driver_path"])
+        
+        chrome_version = self.get_chrome_version()
+        existing_drivers = sorted(self.driver_dir.rglob(chromedriver_filename()),
+                                  key=lambda path: path.stat().st_mtime, reverse=True)
+        
+        # Предпочитаем драйвер из папки нужной версии
+        matching = [path for path in existing_drivers if chrome_version in path.relative_to(self.driver_dir).parts]
+        driver_path = str((matching or existing_drivers)[0]) if existing_drivers else None
+        
+        if driver_path:
+            self.logger.info(f"📁 Найден существующий ChromeDriver: {driver_path}")
+        elif allow_download:
+            driver_path = self.download_chromedriver(chrome_version)
+        
+        if driver_path:
+            self.save_driver_manifest(chrome_version, driver_path)
+            self.logger.info(f"⏱️ Разрешение ChromeDriver без манифеста: {time.perf_counter() - start_time:.3f}с")
+        return driver_path
+    
+    def benchmark_driver_resolution(self) -> Dict[str, float]:
+        """Замер времени поиска ChromeDriver без манифеста и с ним"""
+        timings = {}
+        
+        start_time = time.perf_counter()
+        self.resolve_chromedriver(use_manifest=False, allow_download=False)
+        timings["cold"] = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        self.resolve_chromedriver()
+        timings["warm"] = time.perf_counter() - start_time
+        
+        return timings
+    
+    def setup_webdriver(self) -> bool:
+        """Настройка WebDriver для Windows"""
+        if not load_selenium():
+            return False
+        
+        self.prepare_workspace()
+        
+        try:
+            self.logger.info("🔧 Настройка WebDriver...")
+            
+            # Манифест, затем существующий драйвер, затем загрузка
+            driver_path = self.resolve_chromedriver()
+            
+            if not driver_path:
+                self.logger.error("❌ Не удалось загрузить ChromeDriver")
+                return False
+            
+            # Настройка опций Chrome для Windows
+            chrome_options = Options()
+            
+            # Базовые опции для Windows
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            chrome_options.add_argument("--disable-gpu")
+            chrome_options.add_argument(f"--remote-debugging-port={find_free_port()}")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--disable-plugins")
+            chrome_options.add_argument("--disable-images")
+            chrome_options.add_argument("--disable-background-timer-throttling")
+            chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+            chrome_options.add_argument("--disable-renderer-backgrounding")
+            chrome_options.add_argument("--disable-background-networking")
+            
+            # User agent
+            user_agent = random.choice(self.user_agents)
+            chrome_options.add_argument(f"--user-agent={user_agent}")
+            
+            # Размер окна
+            chrome_options.add_argument("--window-size=1920,1080")
+            if self.browser_profile == "headless":
+                chrome_options.add_argument("--headless=new")
+            else:
+                chrome_options.add_argument("--start-maximized")
+            
+            # Отключаем уведомления об автоматизации
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option('useAutomationExtension', False)
+            chrome_options.add_experimental_option("prefs", {
+                "profile.default_content_setting_values.notifications": 2
+            })
+            
+            # Журнал сетевых событий CDP для режима захвата XHR
+            if self.capture_network:
+                chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            
+            # Создаем сервис
+            service = Service(driver_path)
+            
+            try:
+                # Первая попытка - стандартный режим
+                self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Стандартный режим не сработал: {e}")
+                self.logger.info("🔧 Пробуем альтернативные настройки...")
+                
+                # Альтернативные настройки для проблемных систем
+                alt_options = Options()
+                alt_options.add_argument("--no-sandbox")
+                alt_options.add_argument("--disable-dev-shm-usage")
+                alt_options.add_argument("--disable-gpu")
+                alt_options.add_argument("--disable-extensions")
+                alt_options.add_argument(f"--remote-debugging-port={find_free_port()}")
+                alt_options.add_argument("--disable-web-security")
+                alt_options.add_argument("--allow-running-insecure-content")
+                alt_options.add_argument("--disable-setuid-sandbox")
+                alt_options.add_argument("--disable-background-timer-throttling")
+                alt_options.add_argument("--disable-backgrounding-occluded-windows")
+                alt_options.add_argument("--disable-renderer-backgrounding")
+                
+                if self.browser_profile == "headless":
+                    alt_options.add_argument("--headless=new")
+                
+                if self.capture_network:
+                    alt_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+                
+                # Пробуем альтернативный режим
+                try:
+                    self.driver = webdriver.Chrome(service=service, options=alt_options)
+                    self.logger.info("✅ Альтернативные настройки сработали")
+                except Exception as e2:
+                    self.logger.error(f"❌ Альтернативные настройки тоже не сработали: {e2}")
+                    # Возможно, Chrome обновился: при следующем запуске драйвер подбирается заново
+                    self.invalidate_driver_manifest()
+                    return False
+            
+            # Убираем следы автоматизации
+            try:
+                self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            except Exception:
+                pass
+            
+            # Блокировка второстепенных ресурсов на сетевом уровне
+            if self.browser_profile == "headless":
+                try:
+                    self.driver.execute_cdp_cmd("Network.enable", {})
+                    self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Не удалось включить блокировку ресурсов: {e}")
+            
+            # Включаем сетевые события CDP
+            if self.capture_network:
+                try:
+                    self.driver.execute_cdp_cmd("Network.enable", {})
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Не удалось включить захват сети, используем DOM: {e}")
+                    self.capture_network = False
+            
+            self.logger.info("✅ WebDriver успешно настроен")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка при настройке WebDriver: {e}")
+            return False
+    
+    def get_http_fetcher(self) -> Optional[HttpFetcher]:
+        """HTTP-загрузчик, если выбран способ "http"/"async" и доступен lxml"""
+        if self.fetch_backend not in ("http", "async"):
+            return None
         
-        # Настройка логирования
-        self.setup_logging()
+        if not load_lxml():
+            self.logger.warning("⚠️ lxml не установлен, загрузка без браузера недоступна")
+            self.fetch_backend = "selenium"
+            return None
         
-        # User agents для ротации
-        self.user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
-        ]
+        if self.http_fetcher is None:
+            self.http_fetcher = HttpFetcher(random.choice(self.user_agents), cache=self.get_page_cache())
+        return self.http_fetcher
+    
+    def get_page_cache(self) -> Optional[PageCache]:
+        """Дисковый кэш страниц (None - кэш отключен)"""
+        if not self.page_cache_enabled:
+            return None
         
-        self.logger.info("🚀 TGStat Parser инициализирован для Windows")
+        if self.page_cache is None:
+            self.page_cache = PageCache(
+                Path(self.page_cache_dir), self.page_cache_ttl, self.page_cache_max_mb * 1024 * 1024
+            )
+        return self.page_cache
     
-    def setup_logging(self):
-        """Настройка системы логирования"""
-        log_file = self.logs_dir / f"tgstat_parser_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    def get_known_channels(self) -> KnownChannelsStore:
+        """Хранилище каналов из прошлых запусков"""
+        if self.known_channels is None:
+            self.known_channels = KnownChannelsStore(self.cache_dir / "known_channels.json")
+        return self.known_channels
+    
+    def get_category_state(self) -> CategoryStateStore:
+        """Размеры и время обхода категорий из прошлых запусков"""
+        if self.category_state is None:
+            self.category_state = CategoryStateStore(self.cache_dir / "category_state.json")
+        return self.category_state
+    
+    def filter_known_channels(self, url: str, records: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Новые и изменившиеся записи категории (для инкрементального обхода)"""
+        fresh, new_count, changed_count = self.get_known_channels().classify(url, records)
         
-        # Настройка форматтера
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        self.incremental_stats["new"] += new_count
+        self.incremental_stats["changed"] += changed_count
+        self.incremental_stats["unchanged"] += len(records) - len(fresh)
+        return fresh
+    
+    def is_page_cached(self, page_url: str) -> bool:
+        """Страница есть в кэше и еще свежая (для нее не нужна пауза)"""
+        cache = self.get_page_cache() if self.fetch_backend in ("http", "async") else None
+        if cache is None:
+            return False
         
-        # Консольный хендлер
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        console_handler.setLevel(logging.INFO)
+        cached = cache.get(page_url)
+        return bool(cached and cache.is_fresh(cached[1]))
+    
+    def recover_dead_session(self) -> bool:
+        """Пересоздание сессии, если WebDriver или Chrome перестали отвечать
         
-        # Файловый хендлер
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(logging.DEBUG)
+        Возвращает True, если сессия была мертва и страницу нужно повторить.
+        """
+        if self.driver is None or self.is_driver_alive():
+            return False
         
-        # Настройка логгера
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.DEBUG)
-        self.logger.addHandler(console_handler)
-        self.logger.addHandler(file_handler)
+        self.logger.warning("💥 Сессия WebDriver не отвечает, пересоздаем")
+        self.cleanup()
+        self.crash_stats["restarts"] += 1
         
-        # Отключаем лишние логи Selenium
-        selenium_logger = logging.getLogger('selenium')
-        selenium_logger.setLevel(logging.WARNING)
+        if not self.setup_webdriver():
+            self.logger.error("❌ Не удалось пересоздать WebDriver")
+        return True
     
-    def check_internet_connection(self) -> bool:
-        """Проверка интернет соединения"""
+    def is_driver_alive(self) -> bool:
+        """Проверка, что сессия WebDriver отвечает"""
+        if self.driver is None:
+            return False
+        
         try:
-            self.logger.info("🌐 Проверка интернет соединения...")
-            response = requests.get("https://google.com", timeout=5)
-            if response.status_code == 200:
-                self.logger.info("✅ Интернет соединение установлено")
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+    
+    def ensure_driver(self) -> bool:
+        """Переиспользование прогретой сессии WebDriver или запуск новой
+        
+        Сессия живет между пунктами меню и категориями и закрывается только в
+        cleanup(). Перед повторным использованием проверяется ее состояние;
+        новая сессия сразу проходит проверку Cloudflare на главной странице.
+        """
+        if self.driver is not None:
+            if self.is_driver_alive():
                 return True
-        except requests.RequestException as e:
-            self.logger.error(f"❌ Нет интернет соединения: {e}")
+            
+            self.logger.warning("⚠️ Сессия WebDriver не отвечает, перезапускаем")
+            self.cleanup()
+        
+        start_time = time.perf_counter()
+        if not self.setup_webdriver():
             return False
+        
+        # Прогрев: первая проверка Cloudflare проходится один раз на сессию
+        try:
+            self.driver.get(self.base_url)
+            self.wait_for_cloudflare(self.page_ready_timeout)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Не удалось прогреть сессию: {e}")
+        
+        self.logger.info(f"🔥 Сессия WebDriver готова за {time.perf_counter() - start_time:.1f}с")
+        return True
+    
+    def wait_for_page_ready(self, listing_selector: Optional[str] = None,
+                            timeout: Optional[float] = None) -> bool:
+        """Ожидание готовности страницы по явным условиям
+        
+        Страница готова, когда исчезла проверка Cloudflare и появился контейнер
+        листинга (если задан) либо документ полностью загружен. Возврат
+        происходит сразу после выполнения условий, но не позже timeout.
+        """
+        timeout = timeout or self.page_ready_timeout
+        start_time = time.perf_counter()
+        
+        def page_ready(driver) -> bool:
+            state = driver.execute_script(PAGE_STATE_SCRIPT, CLOUDFLARE_SELECTOR, listing_selector)
+            if state["challenge"] or "tgstat.ru" not in state["url"].lower():
+                return False
+            if listing_selector and state["listing"]:
+                return True
+            return state["readyState"] == "complete"
+        
+        try:
+            WebDriverWait(
+                self.driver, timeout,
+                poll_frequency=self.page_ready_poll,
+                ignored_exceptions=(JavascriptException,),
+            ).until(page_ready)
+            ready = True
+        except TimeoutException:
+            ready = False
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка при ожидании готовности страницы: {e}")
+            ready = False
+        
+        elapsed = time.perf_counter() - start_time
+        self.page_wait_times.append(elapsed)
+        self.logger.info(f"⏱️ Ожидание готовности: {elapsed:.2f}с{'' if ready else ' (превышен лимит)'}")
+        return ready
+    
+    def wait_for_cloudflare(self, timeout: int = 30) -> bool:
+        """Ожидание прохождения Cloudflare защиты"""
+        self.logger.info("🛡️ Ожидание прохождения Cloudflare защиты...")
+        
+        if self.wait_for_page_ready(timeout=timeout):
+            self.logger.info("✅ Cloudflare защита пройдена")
+            return True
+        
+        self.logger.warning("⚠️ Превышено время ожидания Cloudflare")
         return False
     
-    def get_chrome_version(self) -> Optional[str]:
-        """Получение версии Chrome в Windows"""
-        try:
-            # Различные пути установки Chrome в Windows
-            chrome_paths = [
-                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-                r"C:\Users\{username}\AppData\Local\Google\Chrome\Application\chrome.exe".format(
-                    username=os.getenv('USERNAME', '')
-                )
-            ]
+    def get_categories(self, content_type: str = "channels", limit: Optional[int] = 20) -> List[Dict[str, str]]:
+        """Получение списка категорий (limit=None - все найденные)
+        
+        Категории отдаются из кэша сразу. Устаревший кэш обновляется в фоне
+        (через HTTP) или перед ответом (если доступен только браузер).
+        """
+        try:
+            self.logger.info(f"📝 Получение категорий для {content_type}...")
             
-            for chrome_path in chrome_paths:
-                if os.path.exists(chrome_path):
-                    try:
-                        # Получаем версию через wmic
-                        result = subprocess.run([
-                            'wmic', 'datafile', 'where', f'name="{chrome_path.replace(chr(92), chr(92)+chr(92))}"',
-                            'get', 'Version', '/value'
-                        ], capture_output=True, text=True, timeout=10)
-                        
-                        if result.returncode == 0:
-                            for line in result.stdout.strip().split('\n'):
-                                if line.startswith('Version='):
-                                    version = line.split('=')[1].strip()
-                                    major_version = version.split('.')[0]
-                                    self.logger.info(f"🔍 Найдена версия Chrome: {version} (мажорная: {major_version})")
-                                    return major_version
-                    except Exception as e:
-                        self.logger.debug(f"Не удалось получить версию через wmic: {e}")
-                        continue
+            cached = self.load_cached_categories(content_type)
             
-            self.logger.warning("⚠️ Не удалось определить версию Chrome автоматически")
-            return "120"  # Версия по умолчанию
+            if cached is None:
+                categories = self.discover_categories(content_type)
+            else:
+                categories, fresh = cached
+                self.logger.info(f"💾 Категории из кэша ({'актуальны' if fresh else 'устарели'})")
+                
+                if not fresh:
+                    if self.get_http_fetcher() is not None:
+                        self.refresh_categories_in_background(content_type)
+                    else:
+                        categories = self.discover_categories(content_type) or categories
             
+            if categories:
+                self.logger.info(f"✅ Найдено {len(categories)} категорий")
+                return categories[:limit] if limit else categories
+            else:
+                self.logger.warning("⚠️ Категории не найдены, используем fallback")
+                return self.get_fallback_categories(content_type)
+                
         except Exception as e:
-            self.logger.error(f"❌ Ошибка при определении версии Chrome: {e}")
-            return "120"
+            self.logger.error(f"❌ Ошибка при получении категорий: {e}")
+            return self.get_fallback_categories(content_type)
     
-    def download_chromedriver(self, version: str) -> Optional[str]:
-        """Скачивание ChromeDriver для Windows"""
+    def discover_categories(self, content_type: str) -> List[Dict[str, str]]:
+        """Загрузка категорий с сайта и сохранение в кэш"""
+        url = f"{self.base_url}/{content_type}"
+        categories = self.get_categories_http(url, content_type)
+        
+        if not categories:
+            categories = self.get_categories_browser(url, content_type)
+            if categories is None:
+                self.logger.warning("⚠️ Проблемы с Cloudflare при получении категорий")
+                return []
+        
+        unique_categories = self.unique_categories(categories)
+        if unique_categories:
+            self.save_cached_categories(content_type, unique_categories)
+        return unique_categories
+    
+    def unique_categories(self, categories: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Удаление дубликатов категорий по URL"""
+        unique_categories = []
+        seen_urls = set()
+        
+        for cat in categories:
+            if cat["url"] not in seen_urls:
+                unique_categories.append(cat)
+                seen_urls.add(cat["url"])
+        
+        return unique_categories
+    
+    def category_cache_path(self, content_type: str) -> Path:
+        """Файл кэша категорий"""
+        return self.cache_dir / f"categories_{content_type}.json"
+    
+    def load_cached_categories(self, content_type: str) -> Optional[Tuple[List[Dict[str, str]], bool]]:
+        """Категории из кэша и признак свежести (None - кэша нет)"""
         try:
-            self.logger.info(f"📥 Скачивание ChromeDriver версии {version}...")
-            
-            # Список URL для попыток загрузки
-            download_urls = []
-            
-            # Для Chrome 115+ используем новый формат
-            if int(version) >= 115:
-                # Новый Chrome for Testing API
-                download_urls.extend([
-                    f"https://edgedl.me.gvt1.com/edgedl/chrome/chrome-for-testing/{version}.0.0.0/win64/chromedriver-win64.zip",
-                    f"https://edgedl.me.gvt1.com/edgedl/chrome/chrome-for-testing/{version}.0.6312.62/win64/chromedriver-win64.zip",
-                    f"https://edgedl.me.gvt1.com/edgedl/chrome/chrome-for-testing/stable/win64/chromedriver-win64.zip"
-                ])
-            
-            # Для старых версий Chrome используем старый API
-            download_urls.extend([
-                f"https://chromedriver.storage.googleapis.com/{version}.0.0.0/chromedriver_win32.zip",
-                "https://chromedriver.storage.googleapis.com/114.0.5735.90/chromedriver_win32.zip",
-                "https://chromedriver.storage.googleapis.com/113.0.5672.63/chromedriver_win32.zip"
-            ])
-            
-            # Пробуем каждый URL
-            for versions_url in download_urls:
+            data = json.loads(self.category_cache_path(content_type).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        
+        categories = data.get("categories") or []
+        if not categories:
+            return None
+        
+        fresh = time.time() - data.get("fetched_at", 0) < self.category_cache_ttl
+        return categories, fresh
+    
+    def save_cached_categories(self, content_type: str, categories: List[Dict[str, str]]):
+        """Сохранение категорий в кэш"""
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            self.category_cache_path(content_type).write_text(
+                json.dumps({"fetched_at": time.time(), "categories": categories}, ensure_ascii=False, indent=2),
+                encoding='utf-8'
+            )
+        except OSError as e:
+            self.logger.debug(f"Не удалось сохранить кэш категорий: {e}")
+    
+    def refresh_categories_in_background(self, content_type: str):
+        """Фоновое обновление кэша категорий через HTTP"""
+        if content_type in self.category_refreshes:
+            return
+        self.category_refreshes.add(content_type)
+        
+        def refresh():
+            try:
+                url = f"{self.base_url}/{content_type}"
+                categories = self.get_categories_http(url, content_type)
+                if categories:
+                    self.save_cached_categories(content_type, self.unique_categories(categories))
+                    self.logger.debug(f"Кэш категорий {content_type} обновлен в фоне")
+            except Exception as e:
+                self.logger.debug(f"Фоновое обновление категорий не удалось: {e}")
+            finally:
+                self.category_refreshes.discard(content_type)
+        
+        threading.Thread(target=refresh, daemon=True).start()
+    
+    def get_categories_http(self, url: str, content_type: str) -> List[Dict[str, str]]:
+        """Получение категорий без браузера"""
+        fetcher = self.get_http_fetcher()
+        if fetcher is None:
+            return []
+        
+        html = fetcher.fetch(url)
+        if not html:
+            return []
+        
+        page_type = f"categories_{content_type}"
+        ordered = self.selector_cache.ordered(page_type, CATEGORY_SELECTORS)
+        selector, categories = extract_categories_with_selector(html, content_type, self.base_url, ordered)
+        self.selector_cache.count(page_type, ordered, selector)
+        if categories:
+            self.fetch_stats["http"] += 1
+        return categories
+    
+    def get_categories_browser(self, url: str, content_type: str) -> Optional[List[Dict[str, str]]]:
+        """Получение категорий через Selenium (None - страница недоступна)"""
+        if not self.ensure_driver():
+            return None
+        
+        self.driver.get(url)
+        
+        if not self.wait_for_page_ready(", ".join(CATEGORY_SELECTORS)):
+            return None
+        
+        self.fetch_stats["browser"] += 1
+        
+        def find_categories(selector: str) -> List[Dict[str, str]]:
+            found = []
+            for element in self.driver.find_elements(By.CSS_SELECTOR, selector):
                 try:
-                    self.logger.info(f"🔗 Попытка загрузки: {versions_url}")
-                    response = requests.head(versions_url, timeout=10)
-                    if response.status_code == 200:
-                        break
-                except:
+                    link = element.get_attribute("href")
+                    text = element.text.strip()
+                    
+                    if link and text and ("channels" in link or "chats" in link):
+                        found.append({
+                            "name": text,
+                            "url": link,
+                            "type": content_type
+                        })
+                except Exception:
                     continue
-            else:
-                # Если ничего не работает, используем последний стабильный
-                versions_url = "https://chromedriver.storage.googleapis.com/114.0.5735.90/chromedriver_win32.zip"
-            
-            # Скачиваем ChromeDriver
-            driver_zip = self.driver_dir / "chromedriver.zip"
-            
-            self.logger.info(f"🔗 URL для скачивания: {versions_url}")
-            
-            response = requests.get(versions_url, stream=True, timeout=30)
-            response.raise_for_status()
+            return found
+        
+        # Пробуем селекторы, начиная с сработавшего в прошлый раз
+        _, categories = self.selector_cache.find(f"categories_{content_type}", CATEGORY_SELECTORS, find_categories)
+        return categories
+    
+    def get_fallback_categories(self, content_type: str) -> List[Dict[str, str]]:
+        """Fallback категории если не удалось получить с сайта"""
+        if content_type == "channels":
+            return [
+                {"name": "Новости", "url": f"{self.base_url}/channels/news", "type": "channels"},
+                {"name": "Развлечения", "url": f"{self.base_url}/channels/entertainment", "type": "channels"},
+                {"name": "Технологии", "url": f"{self.base_url}/channels/tech", "type": "channels"},
+                {"name": "Спорт", "url": f"{self.base_url}/channels/sport", "type": "channels"},
+                {"name": "Музыка", "url": f"{self.base_url}/channels/music", "type": "channels"},
+            ]
+        else:
+            return [
+                {"name": "Общение", "url": f"{self.base_url}/chats/communication", "type": "chats"},
+                {"name": "Игры", "url": f"{self.base_url}/chats/games", "type": "chats"},
+                {"name": "Работа", "url": f"{self.base_url}/chats/work", "type": "chats"},
+                {"name": "Криптовалюты", "url": f"{self.base_url}/chats/crypto", "type": "chats"},
+            ]
+    
+    def parse_channel_data(self, url: str, max_pages: Optional[int] = 1,
+                           checkpoint: Optional[CrawlCheckpoint] = None) -> List[Dict[str, str]]:
+        """Парсинг данных каналов с указанной страницы
+        
+        max_pages=None - автопагинация: до последней страницы листинга, но не
+        больше auto_max_pages. Обход в любом режиме завершается раньше на пустой
+        странице или странице, повторяющей уже полученные каналы.
+        
+        С checkpoint записи дописываются в файл по страницам, а состояние
+        сохраняется каждые checkpoint_every страниц; если в checkpoint уже есть
+        очередь страниц, обход продолжается с нее. Возвращаются записи,
+        полученные в этом запуске.
+        """
+        results = []
+        start_time = time.perf_counter()
+        self.crawl_count += 1
+        
+        try:
+            self.logger.info(f"🔍 Парсинг: {url} (страниц: {max_pages or 'авто'})")
+            limit = max_pages or self.auto_max_pages
             
-            with open(driver_zip, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            parallel = self.fetch_backend == "async" or (
+                self.fetch_backend == "selenium" and (self.driver_pool_size > 1 or self.tab_count > 1)
+            )
+            if parallel:
+                return self.parse_listing_windows(url, limit, checkpoint)
             
-            # Извлекаем архив
-            with zipfile.ZipFile(driver_zip, 'r') as zip_ref:
-                zip_ref.extractall(self.driver_dir)
+            pending = deque(range(1, limit + 1))
+            retry_queue: List[Tuple[float, int]] = []
+            attempts: Dict[int, int] = {}
+            retries: Dict[int, int] = {}
+            progress = CategoryProgress(url)
+            pages_since_checkpoint = 0
             
-            # Удаляем архив
-            driver_zip.unlink()
+            if checkpoint and checkpoint.state.get("pending") is not None:
+                pending = deque(checkpoint.state["pending"])
+                progress.restore(checkpoint.state["progress"])
+                self.logger.info(
+                    f"⏯️ Продолжение с контрольной точки: страниц в очереди {len(pending)}, "
+                    f"записей уже выдано {checkpoint.state['offset']}"
+                )
             
-            # Ищем исполняемый файл
-            driver_paths = list(self.driver_dir.rglob("chromedriver.exe"))
-            if driver_paths:
-                driver_path = str(driver_paths[0])
-                self.logger.info(f"✅ ChromeDriver загружен: {driver_path}")
-                return driver_path
+            while pending or retry_queue:
+                self.circuit_breaker.wait_if_open(self.logger)
+                
+                # Повтор берется, когда подошло его время или новых страниц не осталось
+                if retry_queue and (retry_queue[0][0] <= time.time() or not pending):
+                    ready_at, page = heapq.heappop(retry_queue)
+                    if ready_at > time.time():
+                        time.sleep(ready_at - time.time())
+                else:
+                    page = pending.popleft()
+                
+                page_results = None
+                page_url = f"{url}?page={page}" if page > 1 else url
+                challenges = self.http_fetcher.stats["challenges"] if self.http_fetcher else 0
+                
+                # Страницы из кэша не нагружают сайт и не требуют паузы,
+                # предзагруженная страница уже выждала свой слот
+                from_cache = self.is_page_cached(page_url) or page_url in self.prefetched
+                if not from_cache:
+                    self.pacer.wait()
+                page_start = time.perf_counter()
+                
+                if pending:
+                    self.prefetch_page(f"{url}?page={pending[0]}")
+                
+                try:
+                    self.logger.info(f"📄 Обработка страницы {page}")
+                    
+                    page_results = self.fetch_page_records(page_url, page)
+                except Exception as e:
+                    self.logger.error(f"❌ Ошибка на странице {page}: {e}")
+                
+                # Ошибка или страница проверки замедляют обход, быстрый ответ ускоряет
+                hit_challenge = self.http_fetcher is not None and self.http_fetcher.stats["challenges"] > challenges
+                if page_results is None or hit_challenge:
+                    self.pacer.on_failure()
+                elif not from_cache:
+                    self.pacer.on_success(time.perf_counter() - page_start)
+                self.logger.info(f"🚦 Темп: {self.pacer.rate():.1f} стр/мин (интервал {self.pacer.delay:.1f}с)")
+                
+                # Упавшая сессия пересоздается, а страница возвращается в очередь
+                if not page_results and self.recover_dead_session():
+                    attempts[page] = attempts.get(page, 0) + 1
+                    if attempts[page] <= self.max_page_attempts:
+                        self.crash_stats["requeued"] += 1
+                        self.logger.info(f"🔁 Страница {page} возвращена в очередь (попытка {attempts[page] + 1})")
+                        pending.appendleft(page)
+                        continue
+                
+                if page_results is None:
+                    self.circuit_breaker.record(False)
+                    retries[page] = retries.get(page, 0) + 1
+                    
+                    if retries[page] <= self.max_page_retries:
+                        delay = backoff_delay(retries[page], self.retry_base_delay, self.retry_max_delay)
+                        heapq.heappush(retry_queue, (time.time() + delay, page))
+                        self.retry_stats["retries"] += 1
+                        self.logger.info(f"🔁 Повтор страницы {page} через {delay:.0f}с (попытка {retries[page] + 1})")
+                    else:
+                        self.retry_stats["abandoned"] += 1
+                        self.logger.warning(f"⚠️ Страница {page} пропущена после {retries[page]} попыток")
+                        progress.page_records[page] = []
+                        self.release_pages(progress, results, checkpoint)
+                    continue
+                
+                self.circuit_breaker.record(True)
+                if page in retries:
+                    self.retry_stats["recovered"] += 1
+                
+                if page_results and not progress.seen_usernames:
+                    self.logger.info(
+                        f"⏱️ Первый канал получен через {time.perf_counter() - start_time:.1f}с "
+                        f"(обход №{self.crawl_count} за сессию)"
+                    )
+                
+                progress.page_records[page] = self.accept_page(progress, page, page_results)
+                self.release_pages(progress, results, checkpoint)
+                
+                if progress.end_page is not None:
+                    removed = trim_pages(pending, retry_queue, progress.end_page)
+                    self.count_skipped_pages(progress, removed)
+                
+                if checkpoint:
+                    pages_since_checkpoint += 1
+                    if pages_since_checkpoint >= self.checkpoint_every:
+                        pages_since_checkpoint = 0
+                        checkpoint.save(
+                            pending=sorted(set(pending) | {item[1] for item in retry_queue}),
+                            progress=progress.to_state()
+                        )
             
-            self.logger.error("❌ ChromeDriver не найден после извлечения")
-            return None
+            self.release_pages(progress, results, checkpoint, final=True)
             
         except Exception as e:
-            self.logger.error(f"❌ Ошибка при загрузке ChromeDriver: {e}")
-            return None
+            self.logger.error(f"❌ Ошибка при парсинге {url}: {e}")
+        finally:
+            self.discard_prefetched()
+            if self.incremental and self.known_channels is not None:
+                self.known_channels.save()
+        
+        return results
     
-    def setup_webdriver(self) -> bool:
-        """Настройка WebDriver для Windows"""
+    def parse_listing_windows(self, url: str, limit: int,
+                              checkpoint: Optional[CrawlCheckpoint] = None) -> List[Dict[str, str]]:
+        """Обход листинга окнами страниц для параллельных способов загрузки
+        
+        Страницы выдаются fetch_pages окнами по crawl_batch_size(), следующее
+        окно - только после разбора предыдущего, поэтому обход
+        останавливается на первой пустой странице, а не после загрузки всех
+        limit страниц. Недоступные страницы повторяются в следующих окнах
+        после паузы.
+        
+        С checkpoint состояние сохраняется после каждого окна, так что
+        прерванный обход продолжается с очереди страниц, как и последовательный.
+        """
+        results = []
+        window_size = self.crawl_batch_size()
+        pending = deque(range(1, limit + 1))
+        retry_queue: List[Tuple[float, int]] = []
+        retries: Dict[int, int] = {}
+        progress = CategoryProgress(url)
+        
+        if checkpoint and checkpoint.state.get("pending") is not None:
+            pending = deque(checkpoint.state["pending"])
+            progress.restore(checkpoint.state["progress"])
+            self.logger.info(
+                f"⏯️ Продолжение с контрольной точки: страниц в очереди {len(pending)}, "
+                f"записей уже выдано {checkpoint.state['offset']}"
+            )
+        
+        if self.fetch_backend == "async" and window_size == 1:
+            self.logger.warning("⚠️ httpx или lxml не установлены, используем последовательную загрузку")
+        
         try:
-            self.logger.info("🔧 Настройка WebDriver...")
-            
-            # Проверяем существующий драйвер
-            existing_drivers = list(self.driver_dir.rglob("chromedriver.exe"))
-            driver_path = None
-            
-            if existing_drivers:
-                driver_path = str(existing_drivers[0])
-                self.logger.info(f"📁 Найден существующий ChromeDriver: {driver_path}")
-            else:
-                # Загружаем новый драйвер
-                chrome_version = self.get_chrome_version()
-                driver_path = self.download_chromedriver(chrome_version)
+            while pending or retry_queue:
+                # Окно: сначала повторы, чье время подошло, затем новые страницы
+                window = []
+                while retry_queue and retry_queue[0][0] <= time.time() and len(window) < window_size:
+                    window.append(heapq.heappop(retry_queue)[1])
+                while pending and len(window) < window_size:
+                    window.append(pending.popleft())
                 
-                if not driver_path:
-                    self.logger.error("❌ Не удалось загрузить ChromeDriver")
-                    return False
-            
-            # Настройка опций Chrome для Windows
-            chrome_options = Options()
+                if not window:
+                    time.sleep(max(0.0, retry_queue[0][0] - time.time()))
+                    continue
+                
+                window.sort()
+                page_results = self.fetch_pages([(url, page) for page in window])
+                
+                for page in window:
+                    # Страница окна за концом листинга загружена впустую
+                    if progress.end_page is not None and page > progress.end_page:
+                        self.pagination_stats["wasted"] += 1
+                        continue
+                    
+                    records = page_results.get((url, page))
+                    if records is None:
+                        retries[page] = retries.get(page, 0) + 1
+                        if retries[page] <= self.max_page_retries:
+                            delay = backoff_delay(retries[page], self.retry_base_delay, self.retry_max_delay)
+                            heapq.heappush(retry_queue, (time.time() + delay, page))
+                            self.retry_stats["retries"] += 1
+                            self.logger.info(f"🔁 Повтор страницы {page} через {delay:.0f}с (попытка {retries[page] + 1})")
+                        else:
+                            self.retry_stats["abandoned"] += 1
+                            self.logger.warning(f"⚠️ Страница {page} пропущена после {retries[page]} попыток")
+                            progress.page_records[page] = []
+                        continue
+                    
+                    if page in retries:
+                        self.retry_stats["recovered"] += 1
+                    progress.page_records[page] = self.accept_page(progress, page, records)
+                
+                self.release_pages(progress, results, checkpoint)
+                
+                if progress.end_page is not None:
+                    removed = trim_pages(pending, retry_queue, progress.end_page)
+                    self.count_skipped_pages(progress, removed)
+                
+                if checkpoint:
+                    checkpoint.save(
+                        pending=sorted(set(pending) | {item[1] for item in retry_queue}),
+                        progress=progress.to_state()
+                    )
             
-            # Базовые опции для Windows
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--remote-debugging-port=9222")
-            chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument("--disable-plugins")
-            chrome_options.add_argument("--disable-images")
-            chrome_options.add_argument("--disable-background-timer-throttling")
-            chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-            chrome_options.add_argument("--disable-renderer-backgrounding")
-            chrome_options.add_argument("--disable-background-networking")
+            self.release_pages(progress, results, checkpoint, final=True)
+        finally:
+            self.close_driver_pool()
+            self.close_async_crawler()
+        
+        return results
+    
+    def release_pages(self, progress: "CategoryProgress", results: List[Dict[str, str]],
+                      checkpoint: Optional[CrawlCheckpoint] = None, final: bool = False):
+        """Выдача записей страниц, готовых по порядку: в результат и в файл контрольной точки"""
+        records = progress.release(final)
+        results.extend(records)
+        if checkpoint and records:
+            checkpoint.append(records)
+    
+    def crawl_batch_size(self) -> int:
+        """Сколько задач очереди выдавать настроенному способу загрузки за раз"""
+        if self.fetch_backend == "async" and load_httpx() and load_lxml():
+            return self.async_concurrency * 2
+        if self.fetch_backend == "selenium" and self.driver_pool_size > 1:
+            return self.driver_pool_size * 2
+        if self.fetch_backend == "selenium" and self.tab_count > 1:
+            return self.tab_count * 2
+        return 1
+    
+    def fetch_pages(self, tasks: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[List[Dict[str, str]]]]:
+        """Загрузка задач (категория, страница) настроенным способом (None - страница недоступна)"""
+        if self.fetch_backend == "async" and load_httpx() and load_lxml():
+            return self.fetch_pages_async(tasks)
+        if self.fetch_backend == "selenium" and self.driver_pool_size > 1:
+            return self.fetch_pages_pool(tasks)
+        if self.fetch_backend == "selenium" and self.tab_count > 1:
+            return self.fetch_pages_tabs(tasks)
+        
+        page_results = {}
+        for url, page in tasks:
+            self.circuit_breaker.wait_if_open(self.logger)
+            page_url = AsyncCrawler.page_url(url, page)
             
-            # User agent
-            user_agent = random.choice(self.user_agents)
-            chrome_options.add_argument(f"--user-agent={user_agent}")
+            from_cache = self.is_page_cached(page_url)
+            if not from_cache and not self.shared_pacing:
+                self.pacer.wait()
+            page_start = time.perf_counter()
             
-            # Размер окна
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--start-maximized")
+            try:
+                records = self.fetch_page_records(page_url, page)
+            except Exception as e:
+                self.logger.error(f"❌ Ошибка на странице {page} ({url}): {e}")
+                records = None
             
-            # Отключаем уведомления об автоматизации
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            chrome_options.add_experimental_option("prefs", {
-                "profile.default_content_setting_values.notifications": 2
-            })
+            if records is None:
+                self.pacer.on_failure()
+            elif not from_cache:
+                self.pacer.on_success(time.perf_counter() - page_start)
             
-            # Создаем сервис
-            service = Service(driver_path)
+            self.circuit_breaker.record(records is not None)
+            page_results[(url, page)] = records
+        
+        return page_results
+    
+    def crawl_all_categories(self, max_pages: Optional[int] = None, content_types: Tuple[str, ...] = ("channels", "chats"),
+                             checkpoint: Optional[CrawlCheckpoint] = None):
+        """Полный обход всех категорий через приоритетную очередь задач
+        
+        Первые страницы всех категорий ставятся в очередь сразу, следующие -
+        по мере обработки (сразу все, которые по пагинатору точно существуют).
+        Крупные и давно не обходившиеся категории идут первыми. Результаты
+        категории сохраняются, как только все ее страницы обработаны, и
+        категория отмечается в контрольной точке: при возобновлении она
+        пропускается, а незаконченные категории обходятся заново.
+        """
+        crawl_queue = CrawlQueue()
+        progress = self.plan_full_crawl(content_types)
+        limit = max_pages or self.auto_max_pages
+        
+        if checkpoint is None:
+            checkpoint = CrawlCheckpoint.start(self.checkpoint_path, kind="full", max_pages=max_pages, completed=[])
+        completed_before = set(checkpoint.state["completed"])
+        if completed_before:
+            self.logger.info(f"⏯️ Продолжение полного обхода: готово категорий {len(completed_before)}")
+        
+        for category in progress.values():
+            if category.url in completed_before:
+                category.done = True
+            else:
+                self.schedule_pages(crawl_queue, category, 1, limit)
+        
+        self.logger.info(f"🗺️ Полный обход: {len(progress)} категорий, до {limit} страниц в каждой")
+        
+        try:
+            self.run_crawl_queue(crawl_queue, progress, limit, checkpoint)
+        finally:
+            self.close_driver_pool()
+            self.close_async_crawler()
+        
+        total = self.finish_full_crawl(progress, crawl_queue.done, time.monotonic() - crawl_queue.started)
+        checkpoint.discard()
+        return total
+    
+    def run_crawl_queue(self, crawl_queue: CrawlQueue, progress: Dict[str, "CategoryProgress"],
+                        limit: int, checkpoint: CrawlCheckpoint):
+        """Выполнение задач очереди полного обхода до ее опустошения"""
+        retries: Dict[Tuple[str, int], int] = {}
+        
+        while crawl_queue:
+            batch = crawl_queue.pop_batch(self.crawl_batch_size())
+            page_results = self.fetch_pages(batch)
             
-            try:
-                # Первая попытка - стандартный режим
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            except Exception as e:
-                self.logger.warning(f"⚠️ Стандартный режим не сработал: {e}")
-                self.logger.info("🔧 Пробуем альтернативные настройки...")
+            for url, page in batch:
+                records = page_results.get((url, page))
+                crawl_queue.done += 1
                 
-                # Альтернативные настройки для проблемных систем
-                alt_options = Options()
-                alt_options.add_argument("--no-sandbox")
-                alt_options.add_argument("--disable-dev-shm-usage")
-                alt_options.add_argument("--disable-gpu")
-                alt_options.add_argument("--disable-extensions")
-                alt_options.add_argument("--remote-debugging-port=9223")
-                alt_options.add_argument("--disable-web-security")
-                alt_options.add_argument("--allow-running-insecure-content")
-                alt_options.add_argument("--disable-setuid-sandbox")
-                alt_options.add_argument("--disable-background-timer-throttling")
-                alt_options.add_argument("--disable-backgrounding-occluded-windows")
-                alt_options.add_argument("--disable-renderer-backgrounding")
+                if records is None:
+                    retries[(url, page)] = retries.get((url, page), 0) + 1
+                    if retries[(url, page)] <= self.max_page_retries:
+                        delay = backoff_delay(retries[(url, page)], self.retry_base_delay, self.retry_max_delay)
+                        self.retry_stats["retries"] += 1
+                        self.logger.info(f"🔁 Повтор страницы {page} ({url}) через {delay:.0f}с")
+                        crawl_queue.push_later(delay, self.get_category_state().score(url), url, page)
+                        continue
+                elif (url, page) in retries:
+                    self.retry_stats["recovered"] += 1
                 
-                # Пробуем альтернативный режим
-                try:
-                    self.driver = webdriver.Chrome(service=service, options=alt_options)
-                    self.logger.info("✅ Альтернативные настройки сработали")
-                except Exception as e2:
-                    self.logger.error(f"❌ Альтернативные настройки тоже не сработали: {e2}")
-                    return False
-            
-            # Убираем следы автоматизации
-            try:
-                self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            except Exception:
-                pass
-            
-            self.logger.info("✅ WebDriver успешно настроен")
-            return True
+                category = progress[url]
+                self.apply_page_result(crawl_queue, category, page, records, limit)
+                
+                if category.done and category.url not in checkpoint.state["completed"]:
+                    checkpoint.state["completed"].append(category.url)
+                    checkpoint.save()
             
-        except Exception as e:
-            self.logger.error(f"❌ Ошибка при настройке WebDriver: {e}")
-            return False
+            self.log_full_crawl_progress(progress, len(crawl_queue), crawl_queue.rate())
     
-    def wait_for_cloudflare(self, timeout: int = 30) -> bool:
-        """Ожидание прохождения Cloudflare защиты"""
+    def plan_full_crawl(self, content_types: Tuple[str, ...]) -> Dict[str, "CategoryProgress"]:
+        """Все категории заданных типов для полного обхода (по URL)"""
+        progress: Dict[str, CategoryProgress] = {}
+        
+        for content_type in content_types:
+            for category in self.get_categories(content_type, limit=None):
+                if category["url"] not in progress:
+                    progress[category["url"]] = CategoryProgress(category["url"], category["name"], content_type)
+        
+        return progress
+    
+    def schedule_pages(self, task_queue, category: "CategoryProgress", last_page: int, limit: int):
+        """Постановка в очередь страниц категории до last_page (не дальше limit)
+        
+        task_queue - любая очередь с методом push(score, url, page):
+        CrawlQueue в одном процессе или JobStore для воркеров.
+        """
+        score = self.get_category_state().score(category.url)
+        while category.next_page <= min(last_page, limit):
+            task_queue.push(score, category.url, category.next_page)
+            category.outstanding += 1
+            category.next_page += 1
+    
+    def apply_page_result(self, task_queue, category: "CategoryProgress", page: int,
+                          records: Optional[List[Dict[str, str]]], limit: int):
+        """Обработка результата страницы: учет, планирование следующих, сохранение категории
+        
+        records=None - страница так и не получена (повторы исчерпаны).
+        """
+        category.outstanding -= 1
+        
+        if category.end_page is not None and page > category.end_page:
+            self.count_skipped_pages(category, 1)
+        elif records is None:
+            self.retry_stats["abandoned"] += 1
+            self.logger.warning(f"⚠️ Страница {page} ({category.name}) пропущена после повторов")
+        else:
+            category.page_records[page] = self.accept_page(category, page, records)
+        
+        # Следующие страницы: сразу все, что есть по пагинатору, а дальше - по одной
+        # после ответа на последнюю поставленную
+        if category.end_page is None:
+            if category.known_pages >= category.next_page:
+                self.schedule_pages(task_queue, category, category.known_pages, limit)
+            elif page == category.next_page - 1:
+                self.schedule_pages(task_queue, category, category.next_page, limit)
+        elif category.next_page <= category.end_page:
+            self.schedule_pages(task_queue, category, category.end_page, limit)
+        
+        if category.outstanding == 0 and not category.done:
+            category.done = True
+            self.finish_category(category)
+    
+    def log_full_crawl_progress(self, progress: Dict[str, "CategoryProgress"], depth: int, rate: float):
+        """Готовые категории, глубина очереди, темп и оценка времени до завершения"""
+        state = self.get_category_state()
+        completed = sum(category.done for category in progress.values())
+        
+        # Оставшиеся страницы: очередь плюс ожидаемый остаток начатых категорий
+        remaining = depth + sum(
+            max(state.expected_pages(category.url) - category.next_page + 1, 0)
+            for category in progress.values() if category.outstanding and category.end_page is None
+        )
+        eta = remaining / rate if rate > 0 else None
+        
+        self.logger.info(
+            f"🗺️ Категорий {completed}/{len(progress)}, в очереди {depth}, "
+            f"темп {rate * 60:.1f} стр/мин, "
+            f"осталось ~{f'{eta / 60:.1f} мин' if eta is not None else 'н/д'}"
+        )
+    
+    def finish_full_crawl(self, progress: Dict[str, "CategoryProgress"], pages: int, elapsed: float) -> int:
+        """Сохранение состояния и итог полного обхода; возвращает число записей"""
+        self.get_category_state().save()
+        if self.incremental and self.known_channels is not None:
+            self.known_channels.save()
+        
+        completed = sum(category.done for category in progress.values())
+        total_channels = sum(len(category.records()) for category in progress.values())
+        self.logger.info(
+            f"🗺️ Полный обход завершен: категорий {completed}, страниц {pages}, "
+            f"каналов {total_channels} за {elapsed / 60:.1f} мин "
+            f"({completed / elapsed * 3600 if elapsed else 0:.1f} категорий/час)"
+        )
+        return total_channels
+    
+    def run_coordinator(self, store: JobStore, max_pages: Optional[int] = None,
+                        content_types: Tuple[str, ...] = ("channels", "chats")) -> int:
+        """Координатор распределенного обхода
+        
+        Ставит задачи полного обхода в общую очередь, возвращает в нее задачи
+        с истекшей арендой и обрабатывает результаты воркеров так же, как
+        crawl_all_categories. По завершении отмечает обход законченным, чтобы
+        воркеры вышли.
+        """
+        progress = self.plan_full_crawl(content_types)
+        limit = max_pages or self.auto_max_pages
+        started = time.monotonic()
+        last_report = 0.0
+        pages = 0
+        
+        store.reset()
+        for category in progress.values():
+            self.schedule_pages(store, category, 1, limit)
+        
+        self.logger.info(f"🧭 Координатор: {len(progress)} категорий, очередь {store.path}")
+        
+        try:
+            while not all(category.done for category in progress.values()):
+                reclaimed = store.reclaim_expired()
+                if reclaimed:
+                    self.logger.warning(f"⏰ Возвращено в очередь задач с истекшей арендой: {reclaimed}")
+                
+                results = store.take_results()
+                for url, page, records, last_page in results:
+                    pages += 1
+                    # Пагинатор разобран воркером: без границы категория шла бы по одной странице
+                    self.record_pager_hint(url, last_page)
+                    self.apply_page_result(store, progress[url], page, records, limit)
+                
+                if time.monotonic() - last_report >= self.coordinator_report_interval:
+                    last_report = time.monotonic()
+                    counts = store.counts()
+                    self.logger.info(
+                        f"🧭 Воркеров активно {store.active_workers()}, задач в очереди "
+                        f"{counts.get('pending', 0)}, в работе {counts.get('leased', 0)}"
+                    )
+                    elapsed = time.monotonic() - started
+                    self.log_full_crawl_progress(progress, counts.get('pending', 0) + counts.get('leased', 0),
+                                                 pages / elapsed if elapsed else 0)
+                
+                if not results:
+                    time.sleep(self.coordinator_poll)
+        finally:
+            store.set_finished()
+        
+        return self.finish_full_crawl(progress, pages, time.monotonic() - started)
+    
+    def run_worker(self, store: JobStore, worker_id: str) -> int:
+        """Воркер распределенного обхода; возвращает число обработанных страниц
+        
+        Берет задачи из общей очереди по одной, продлевает аренду heartbeat-ом
+        и отчитывается результатом. Параллельность дают процессы, поэтому
+        страница грузится без пула и вкладок. Общий потолок темпа делится между
+        всеми воркерами через очередь и заменяет локальную паузу.
+        
+        Воркер присоединяется к обходу (run_id), который застал незавершенным,
+        и выходит, только когда завершен именно он: флаг завершения прошлого
+        обхода в той же базе не останавливает воркер, запущенный раньше
+        координатора.
+        """
+        if self.fetch_backend == "async":
+            self.fetch_backend = "http"
+        self.driver_pool_size = 1
+        self.tab_count = 1
+        self.shared_pacing = True
+        
+        current: Dict[str, Optional[Tuple[str, int]]] = {"task": None}
+        stop = threading.Event()
+        pages = 0
+        joined_run: Optional[float] = None
+        
+        def beat():
+            while not stop.wait(store.lease_seconds / 3):
+                try:
+                    store.heartbeat(worker_id, current["task"])
+                except Exception as e:
+                    self.logger.debug(f"Heartbeat не записан: {e}")
+        
+        store.heartbeat(worker_id)
+        heartbeat_thread = threading.Thread(target=beat, name="heartbeat", daemon=True)
+        heartbeat_thread.start()
+        self.logger.info(f"👷 Воркер {worker_id}: очередь {store.path}")
+        
         try:
-            self.logger.info("🛡️ Ожидание прохождения Cloudflare защиты...")
+            while True:
+                run_id, finished = store.run_state()
+                if run_id is not None and not finished and run_id != joined_run:
+                    joined_run = run_id
+                    self.logger.info(f"👷 Воркер {worker_id}: подключен к обходу {run_id:.0f}")
+                
+                if joined_run is None:
+                    time.sleep(self.coordinator_poll)
+                    continue
+                
+                task = store.claim(worker_id)
+                if task is None:
+                    if finished and run_id == joined_run:
+                        break
+                    time.sleep(self.coordinator_poll)
+                    continue
+                
+                current["task"] = task
+                pause = store.reserve_slot(self.pacer.min_delay)
+                if pause > 0:
+                    time.sleep(pause)
+                
+                records = self.fetch_pages([task]).get(task)
+                current["task"] = None
+                
+                if store.complete(worker_id, task, records, self.pager_hints.get(task[0])):
+                    pages += 1
+                else:
+                    self.logger.warning(f"⚠️ Аренда страницы {task[1]} ({task[0]}) истекла, результат отброшен")
+        finally:
+            stop.set()
+        
+        self.logger.info(f"👷 Воркер {worker_id}: обработано страниц {pages}")
+        return pages
+    
+    def finish_category(self, category: "CategoryProgress"):
+        """Сохранение результатов обработанной категории"""
+        records = category.records()
+        self.get_category_state().record(category.url, category.pages, len(category.seen_usernames))
+        
+        if records:
+            self.save_results(records, f"{category.content_type}_{category.name.replace(' ', '_')}")
+        self.logger.info(f"✅ Категория {category.name}: страниц {category.pages}, записей {len(records)}")
+    
+    def accept_page(self, progress: "CategoryProgress", page: int,
+                    page_results: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Учет полученной страницы категории; возвращает записи для выдачи
+        
+        Выставляет progress.end_page, если после этой страницы обход категории
+        не нужен: листинг закончился (пустая или повторная страница) или в
+        инкрементальном режиме подряд идут только известные каналы. Пагинатор
+        конца не задает, только поднимает progress.known_pages.
+        """
+        self.pagination_stats["pages"] += 1
+        
+        # Пустая страница или только уже полученные каналы - листинг закончился
+        usernames = {record["username"] for record in page_results}
+        if not usernames or usernames <= progress.seen_usernames:
+            reason = "пустая страница" if not usernames else "повтор уже полученных каналов"
+            self.pagination_stats["wasted"] += 1
+            progress.finish(page, "end")
+            self.logger.info(f"🏁 Страница {page}: {reason}, обход завершен")
+            return []
+        
+        progress.seen_usernames |= usernames
+        progress.pages += 1
+        self.logger.info(f"✅ Страница {page}: найдено {len(page_results)} каналов")
+        
+        progress.known_pages = max(progress.known_pages, self.pager_hints.get(progress.url, 0))
+        
+        if self.incremental:
+            known_before = set(self.get_known_channels().categories.get(progress.url, {}))
+            page_results = self.filter_known_channels(progress.url, page_results)
+            progress.known_streak = progress.known_streak + 1 if usernames <= known_before else 0
+            self.logger.info(f"🆕 Страница {page}: новых или изменившихся {len(page_results)}")
             
-            start_time = time.time()
+            if progress.known_streak >= self.incremental_stop_pages:
+                progress.finish(page, "known")
+                self.logger.info(
+                    f"🏁 {progress.known_streak} стр. подряд только с известными каналами, "
+                    f"обход категории завершен"
+                )
+        
+        return page_results
+    
+    def count_skipped_pages(self, progress: "CategoryProgress", count: int):
+        """Учет страниц, не загруженных из-за раннего завершения категории"""
+        if progress.end_reason == "known":
+            self.incremental_stats["pages_saved"] += count
+        else:
+            self.pagination_stats["trimmed"] += count
+    
+    def fetch_pages_async(self, tasks: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[List[Dict[str, str]]]]:
+        """Параллельная загрузка задач (категория, страница) через httpx
+        
+        Страницы, не полученные без браузера, догружаются через Selenium.
+        """
+        self.pacer.max_concurrency = self.async_concurrency
+        if self.async_crawler is None:
+            self.async_crawler = AsyncCrawler(random.choice(self.user_agents), self.async_concurrency,
+                                              self.async_per_host, pacer=self.pacer, cache=self.get_page_cache())
+        crawler = self.async_crawler
+        
+        self.logger.info(
+            f"⚡ Асинхронный обход: {len(tasks)} страниц, "
+            f"параллельно {self.async_concurrency} (на хост {self.async_per_host})"
+        )
+        ok_before, elapsed_before = crawler.stats["ok"], crawler.stats["elapsed"]
+        page_results = crawler.run(tasks)
+        
+        ok = crawler.stats["ok"] - ok_before
+        elapsed = crawler.stats["elapsed"] - elapsed_before
+        self.fetch_stats["http"] += ok
+        self.logger.info(
+            f"⚡ Получено {ok} из {len(tasks)} страниц за {elapsed:.1f}с "
+            f"({ok / elapsed if elapsed else 0:.1f} стр/с)"
+        )
+        
+        for url, page in tasks:
+            if page_results.get((url, page)):
+                self.http_listings.add(url)
+        
+        # Пустая разметка означает конец листинга, только если листинг уже отдавался без
+        # браузера; иначе карточки, скорее всего, рисует JS. Браузер идет в общем темпе
+        for url, page in tasks:
+            records = page_results.get((url, page))
+            if records is None or (not records and url not in self.http_listings):
+                self.logger.info(f"🌐 Страница {page} ({url}) недоступна без браузера, переходим на Selenium")
+                self.pacer.wait()
+                page_start = time.perf_counter()
+                records = self.fetch_page_records_browser(AsyncCrawler.page_url(url, page), page)
+                
+                if records is None:
+                    self.pacer.on_failure()
+                else:
+                    self.pacer.on_success(time.perf_counter() - page_start)
+                page_results[(url, page)] = records
+        
+        return page_results
+    
+    def spawn_worker(self) -> Optional["TGStatParser"]:
+        """Копия парсера с собственной сессией WebDriver для пула
+        
+        Статистика у воркера своя (потоки пула не пишут в общие словари и
+        списки) и добавляется к основной в close_driver_pool().
+        """
+        worker = copy.copy(self)
+        worker.driver = None
+        worker.async_crawler = None
+        worker.watchdog = BrowserWatchdog(self.watchdog.max_rss_mb, self.watchdog.max_pages)
+        worker.fetch_stats = {key: 0 for key in self.fetch_stats}
+        worker.crash_stats = {key: 0 for key in self.crash_stats}
+        worker.network_capture_stats = {key: 0 for key in self.network_capture_stats}
+        worker.extraction_timings = {}
+        worker.profile_stats = {}
+        worker.browser_mode_stats = {}
+        worker.harvest_stats = []
+        worker.page_wait_times = []
+        
+        if not worker.setup_webdriver():
+            return None
+        return worker
+    
+    def get_driver_pool(self) -> List["TGStatParser"]:
+        """Сессии пула; недостающие запускаются, уже работающие переиспользуются"""
+        missing = self.driver_pool_size - len(self.driver_pool)
+        if missing <= 0:
+            return self.driver_pool
+        
+        # Первая сессия создается отдельно: при необходимости она же скачивает ChromeDriver
+        if not self.driver_pool:
+            worker = self.spawn_worker()
+            if worker is None:
+                self.logger.error("❌ Не удалось запустить WebDriver для пула")
+                return self.driver_pool
+            self.driver_pool.append(worker)
+            missing -= 1
+        
+        spawned: List[Optional["TGStatParser"]] = [None] * missing
+        
+        def spawn(index: int):
+            spawned[index] = self.spawn_worker()
+        
+        threads = [threading.Thread(target=spawn, args=(index,), daemon=True) for index in range(missing)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.driver_pool.extend(worker for worker in spawned if worker is not None)
+        if len(self.driver_pool) < self.driver_pool_size:
+            self.logger.warning(f"⚠️ Запущено {len(self.driver_pool)} из {self.driver_pool_size} сессий пула")
+        return self.driver_pool
+    
+    def close_async_crawler(self):
+        """Закрытие клиента и цикла событий асинхронного обхода"""
+        if self.async_crawler is not None:
+            self.async_crawler.close()
+            self.async_crawler = None
+    
+    def close_driver_pool(self):
+        """Закрытие сессий пула с переносом их статистики"""
+        for worker in self.driver_pool:
+            worker.cleanup()
+            self.watchdog.merge(worker.watchdog)
+            self.merge_worker_stats(worker)
+        self.driver_pool = []
+    
+    def merge_worker_stats(self, worker: "TGStatParser"):
+        """Добавление статистики воркера пула к основной"""
+        for totals, stats in ((self.fetch_stats, worker.fetch_stats), (self.crash_stats, worker.crash_stats),
+                              (self.network_capture_stats, worker.network_capture_stats)):
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
+        
+        for totals, stats in ((self.extraction_timings, worker.extraction_timings),
+                              (self.profile_stats, worker.profile_stats)):
+            for key, values in stats.items():
+                totals.setdefault(key, []).extend(values)
+        
+        for mode, stats in worker.browser_mode_stats.items():
+            totals = self.browser_mode_stats.setdefault(mode, {"pages": 0, "time": 0.0, "peak_rss": 0})
+            totals["pages"] += stats["pages"]
+            totals["time"] += stats["time"]
+            totals["peak_rss"] = max(totals["peak_rss"], stats["peak_rss"])
+        
+        self.harvest_stats.extend(worker.harvest_stats)
+        self.page_wait_times.extend(worker.page_wait_times)
+    
+    def fetch_pages_pool(self, tasks: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[List[Dict[str, str]]]]:
+        """Загрузка задач (категория, страница) свободными сессиями пула (None - страница недоступна)"""
+        pending: "queue.Queue[Tuple[str, int]]" = queue.Queue()
+        for task in tasks:
+            pending.put(task)
+        
+        page_results: Dict[Tuple[str, int], Optional[List[Dict[str, str]]]] = {}
+        attempts: Dict[Tuple[str, int], int] = {}
+        worker_stats: List[Dict[str, float]] = []
+        workers = self.get_driver_pool()[:len(tasks)]
+        
+        self.logger.info(f"👷 Пул WebDriver: {len(workers)} сессий, {len(tasks)} страниц")
+        
+        def run_worker(index: int, worker: "TGStatParser"):
+            stats = {"worker": index, "pages": 0, "time": 0.0}
+            worker_stats.append(stats)
+            start_time = time.perf_counter()
             
-            while time.time() - start_time < timeout:
-                try:
-                    # Проверяем наличие элементов Cloudflare
-                    cf_elements = self.driver.find_elements(By.CSS_SELECTOR, 
-                        ".cf-browser-verification, .cf-checking-browser, .cf-spinner-allow-5-secs")
+            try:
+                while True:
+                    try:
+                        url, page = pending.get_nowait()
+                    except queue.Empty:
+                        break
                     
-                    if not cf_elements:
-                        # Проверяем, что страница загрузилась
-                        if "tgstat.ru" in self.driver.current_url.lower():
-                            self.logger.info("✅ Cloudflare защита пройдена")
-                            return True
+                    self.pacer.wait()
+                    page_start = time.perf_counter()
                     
-                    time.sleep(2)
+                    try:
+                        records = worker.fetch_page_records_browser(AsyncCrawler.page_url(url, page), page)
+                    except Exception as e:
+                        self.logger.error(f"❌ Воркер {index}, страница {page}: {e}")
+                        records = None
                     
-                except Exception:
-                    pass
-            
-            self.logger.warning("⚠️ Превышено время ожидания Cloudflare")
-            return False
-            
-        except Exception as e:
-            self.logger.error(f"❌ Ошибка при ожидании Cloudflare: {e}")
-            return False
+                    if records is None:
+                        self.pacer.on_failure()
+                    else:
+                        self.pacer.on_success(time.perf_counter() - page_start)
+                    
+                    if not records and worker.recover_dead_session():
+                        attempts[(url, page)] = attempts.get((url, page), 0) + 1
+                        if attempts[(url, page)] <= self.max_page_attempts:
+                            worker.crash_stats["requeued"] += 1
+                            pending.put((url, page))
+                            continue
+                    
+                    page_results[(url, page)] = records
+                    stats["pages"] += 1
+            finally:
+                stats["time"] = time.perf_counter() - start_time
+        
+        threads = [threading.Thread(target=run_worker, args=(index, worker), daemon=True)
+                   for index, worker in enumerate(workers, 1)]
+        
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for stats in sorted(worker_stats, key=lambda item: item["worker"]):
+            rate = stats["pages"] / stats["time"] * 60 if stats["time"] else 0
+            self.logger.info(
+                f"👷 Воркер {stats['worker']}: страниц {stats['pages']} за {stats['time']:.1f}с "
+                f"({rate:.1f} стр/мин)"
+            )
+        
+        return page_results
     
-    def get_categories(self, content_type: str = "channels") -> List[Dict[str, str]]:
-        """Получение списка категорий"""
-        try:
-            self.logger.info(f"📝 Получение категорий для {content_type}...")
-            
-            url = f"{self.base_url}/{content_type}"
-            self.driver.get(url)
-            
-            if not self.wait_for_cloudflare():
-                self.logger.warning("⚠️ Проблемы с Cloudflare, используем fallback категории")
-                return self.get_fallback_categories(content_type)
-            
-            time.sleep(3)
-            
-            categories = []
-            
-            # Пробуем различные селекторы для категорий
-            category_selectors = [
-                "a[href*='/channels/']",
-                "a[href*='/chats/']",
-                ".category-link",
-                ".nav-link",
-                "[data-category]"
-            ]
+    def record_browser_mode(self, mode: str, pages: int, elapsed: float):
+        """Учет страниц, времени и пикового RSS для режима браузера"""
+        stats = self.browser_mode_stats.setdefault(mode, {"pages": 0, "time": 0.0, "peak_rss": 0})
+        stats["pages"] += pages
+        stats["time"] += elapsed
+        
+        rss = get_browser_rss(self.driver)
+        if rss:
+            stats["peak_rss"] = max(stats["peak_rss"], rss)
+    
+    def fetch_pages_tabs(self, tasks: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[List[Dict[str, str]]]]:
+        """Загрузка задач (категория, страница) во вкладках одной сессии (None - страница недоступна)"""
+        if not self.ensure_driver():
+            return {task: None for task in tasks}
+        
+        pending = list(reversed(tasks))
+        page_results: Dict[Tuple[str, int], Optional[List[Dict[str, str]]]] = {}
+        listing_selector = ", ".join(CHANNEL_LINK_SELECTORS)
+        
+        # Открываем вкладки
+        handles = [self.driver.current_window_handle]
+        for _ in range(min(self.tab_count, len(tasks)) - 1):
+            self.driver.switch_to.new_window("tab")
+            handles.append(self.driver.current_window_handle)
+        
+        self.logger.info(f"🗂️ Вкладок: {len(handles)}, страниц: {len(tasks)}")
+        
+        # Вкладка -> (задача, время начала загрузки, адрес вкладки до перехода)
+        in_flight: Dict[str, Tuple[Tuple[str, int], float, str]] = {}
+        
+        def navigate(handle: str):
+            if not pending:
+                return
+            task = pending.pop()
+            self.driver.switch_to.window(handle)
+            previous_url = self.driver.current_url
+            self.driver.execute_script("window.location.href = arguments[0];", AsyncCrawler.page_url(*task))
+            in_flight[handle] = (task, time.perf_counter(), previous_url)
+        
+        start_time = time.perf_counter()
+        for handle in handles:
+            navigate(handle)
+        
+        while in_flight:
+            progressed = False
             
-            for selector in category_selectors:
+            for handle in list(in_flight):
+                (url, page), started, previous_url = in_flight[handle]
+                self.driver.switch_to.window(handle)
+                
                 try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    
-                    for element in elements:
-                        try:
-                            link = element.get_attribute("href")
-                            text = element.text.strip()
-                            
-                            if link and text and ("channels" in link or "chats" in link):
-                                categories.append({
-                                    "name": text,
-                                    "url": link,
-                                    "type": content_type
-                                })
-                        except Exception:
-                            continue
-                    
-                    if categories:
-                        break
-                        
+                    state = self.driver.execute_script(PAGE_STATE_SCRIPT, CLOUDFLARE_SELECTOR, listing_selector)
                 except Exception:
                     continue
+                
+                # Пока переход не зафиксирован, вкладка показывает прежнюю страницу
+                # (предыдущий листинг или главную после прогрева) - она не годится.
+                # Другой адрес, кроме прежнего, означает редирект и тоже принимается
+                current_url = state["url"]
+                arrived = is_same_page(current_url, AsyncCrawler.page_url(url, page)) or (
+                    current_url != previous_url and "tgstat.ru" in current_url.lower()
+                )
+                ready = (arrived and not state["challenge"]
+                         and (state["listing"] or state["readyState"] == "complete"))
+                timed_out = time.perf_counter() - started > self.page_ready_timeout
+                
+                if not ready and not timed_out:
+                    continue
+                
+                if ready:
+                    self.harvest_lazy_content(page)
+                    page_results[(url, page)] = self.extract_channels()
+                    self.fetch_stats["browser"] += 1
+                else:
+                    self.logger.warning(f"⚠️ Страница {page} не загрузилась за {self.page_ready_timeout}с")
+                    page_results[(url, page)] = None
+                
+                del in_flight[handle]
+                self.record_browser_mode("tabs", 0, 0.0)
+                navigate(handle)
+                progressed = True
             
-            # Убираем дубликаты
-            unique_categories = []
-            seen_urls = set()
+            if not progressed:
+                time.sleep(self.page_ready_poll)
+        
+        self.record_browser_mode("tabs", len(tasks), time.perf_counter() - start_time)
+        
+        # Закрываем дополнительные вкладки
+        for handle in handles[1:]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.driver.switch_to.window(handles[0])
+        
+        return page_results
+    
+    def fetch_page_records(self, page_url: str, page: int) -> Optional[List[Dict[str, str]]]:
+        """Загрузка страницы листинга и извлечение каналов (None - страница недоступна)"""
+        listing_url = page_url.split("?", 1)[0]
+        page_results = self.fetch_page_records_http(page_url, page)
+        if page_results:
+            self.http_listings.add(listing_url)
+            return page_results
+        
+        # Листинг уже отдавался без браузера - пустая разметка означает его конец
+        if page_results is not None and page > 1 and listing_url in self.http_listings:
+            self.logger.info(f"🌐 Разметка страницы {page} не содержит каналов, листинг закончился")
+            return []
+        
+        if page_results is not None:
+            self.logger.info(f"🌐 Разметка страницы {page} не содержит каналов, переходим на Selenium")
+        return self.fetch_page_records_browser(page_url, page)
+    
+    def fetch_page_records_http(self, page_url: str, page: int) -> Optional[List[Dict[str, str]]]:
+        """Загрузка страницы листинга без браузера
+        
+        None - страница недоступна (ошибка или проверка), пустой список -
+        пригодная разметка без карточек.
+        """
+        fetcher = self.get_http_fetcher()
+        if fetcher is None:
+            return None
+        
+        prefetched = self.prefetched.pop(page_url, None)
+        html = prefetched.result() if prefetched else fetcher.fetch(page_url)
+        if html is None:
+            self.logger.info(f"🌐 Страница {page} недоступна без браузера, переходим на Selenium")
+            return None
+        if not html:
+            # 404 - ответ сайта, а не JS-отрисовка: листинг закончился
+            self.http_listings.add(page_url.split("?", 1)[0])
+            return []
+        
+        self.record_pager_hint(page_url.split("?", 1)[0], extract_last_page(html))
+        
+        start_time = time.perf_counter()
+        ordered = self.selector_cache.ordered("listing", CHANNEL_LINK_SELECTORS)
+        selector, page_results = extract_channels_with_selector(html, ordered)
+        elapsed = time.perf_counter() - start_time
+        self.selector_cache.count("listing", ordered, selector)
+        
+        if not page_results:
+            return []
+        
+        self.fetch_stats["http"] += 1
+        self.extraction_timings.setdefault("http", []).append(elapsed)
+        self.logger.info(f"🌐 Страница {page} загружена без браузера ({elapsed:.3f}с на разбор)")
+        return page_results
+    
+    def fetch_page_records_browser(self, page_url: str, page: int) -> Optional[List[Dict[str, str]]]:
+        """Загрузка страницы листинга через Selenium"""
+        if not self.ensure_driver():
+            return None
+        
+        if self.capture_network:
+            self.drain_network_log()
+        
+        start_time = time.perf_counter()
+        page_results = self.load_page_in_browser(page_url, page)
+        if page_results is not None:
+            self.record_browser_mode("single", 1, time.perf_counter() - start_time)
+        
+        self.recycle_driver_if_needed()
+        return page_results
+    
+    def record_pager_hint(self, url: str, last_page: Optional[int]):
+        """Запоминание наибольшей страницы листинга из пагинатора (граница только растет)"""
+        if last_page and last_page > self.pager_hints.get(url, 1):
+            self.pager_hints[url] = last_page
+            self.logger.info(f"📑 Пагинатор: есть страницы до {last_page}")
+    
+    def prefetch_page(self, page_url: str):
+        """Фоновая загрузка следующей страницы, пока обрабатывается текущая"""
+        if not self.prefetch_pages or page_url in self.prefetched:
+            return
+        
+        fetcher = self.get_http_fetcher()
+        if fetcher is None:
+            return
+        
+        if self.prefetch_executor is None:
+            self.prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        
+        # Предзагрузка занимает слот темпа так же, как обычный запрос
+        from_cache = self.is_page_cached(page_url)
+        
+        def run() -> Optional[str]:
+            if not from_cache:
+                pause = self.pacer.reserve()
+                if pause > 0:
+                    time.sleep(pause)
+            return fetcher.fetch(page_url)
+        
+        self.prefetched[page_url] = self.prefetch_executor.submit(run)
+        self.pagination_stats["prefetched"] += 1
+    
+    def discard_prefetched(self):
+        """Отмена невостребованных предзагрузок (загруженные считаются лишними)"""
+        for future in self.prefetched.values():
+            if not future.cancel() and future.result() is not None:
+                self.pagination_stats["wasted"] += 1
+        self.prefetched.clear()
+    
+    def recycle_driver_if_needed(self):
+        """Перезапуск сессии между страницами по сигналу watchdog"""
+        reason = self.watchdog.page_served(self.driver)
+        if not reason:
+            return
+        
+        self.logger.info(f"♻️ Перезапуск Chrome: {reason}")
+        self.cleanup()
+        self.watchdog.restarted()
+        
+        # Без прогрева: следующая страница сама пройдет проверку
+        if not self.setup_webdriver():
+            self.logger.error("❌ Не удалось перезапустить WebDriver")
+    
+    def load_page_in_browser(self, page_url: str, page: int) -> Optional[List[Dict[str, str]]]:
+        """Навигация в текущей вкладке, ожидание готовности и извлечение"""
+        self.driver.get(page_url)
+        
+        if not self.wait_for_page_ready(", ".join(CHANNEL_LINK_SELECTORS)):
+            self.logger.warning(f"⚠️ Проблемы с Cloudflare на странице {page}")
+            return None
+        
+        self.fetch_stats["browser"] += 1
+        if self.http_fetcher is not None:
+            self.http_fetcher.adopt_browser_session(self.driver)
+        
+        self.record_page_metrics(page)
+        
+        try:
+            self.record_pager_hint(page_url.split("?", 1)[0], self.driver.execute_script(PAGER_SCRIPT))
+        except Exception:
+            pass
+        
+        # Данные листинга, пришедшие по сети, не требуют ожидания отрисовки
+        if self.capture_network:
+            page_results = self.collect_network_listings()
+            if page_results:
+                self.network_capture_stats["network"] += 1
+                self.logger.info(f"📡 Страница {page}: данные получены из сетевых ответов")
+                return page_results
             
-            for cat in categories:
-                if cat["url"] not in seen_urls:
-                    unique_categories.append(cat)
-                    seen_urls.add(cat["url"])
+            self.network_capture_stats["dom"] += 1
+            self.logger.info("📡 Сетевых ответов листинга нет, извлекаем из DOM")
+        
+        # Прокручиваем страницу, пока подгружаются новые карточки
+        self.harvest_lazy_content(page)
+        
+        return self.extract_channels()
+    
+    def record_page_metrics(self, page: int):
+        """Замер переданных байт и времени загрузки страницы для текущего профиля"""
+        try:
+            metrics = self.driver.execute_script(PAGE_METRICS_SCRIPT)
+        except Exception:
+            return
+        
+        self.profile_stats.setdefault(self.browser_profile, []).append(metrics)
+        self.logger.info(
+            f"📶 Страница {page} ({self.browser_profile}): {metrics['bytes'] / 1024:.0f} КБ, "
+            f"загрузка {metrics['loadMs'] / 1000:.2f}с"
+        )
+    
+    def harvest_lazy_content(self, page: int) -> List[Dict[str, float]]:
+        """Пошаговая прокрутка до прекращения роста числа карточек"""
+        steps = []
+        start_time = time.perf_counter()
+        
+        try:
+            self.driver.set_script_timeout(self.harvest_max_wait_ms / 1000 + 5)
             
-            if unique_categories:
-                self.logger.info(f"✅ Найдено {len(unique_categories)} категорий")
-                return unique_categories[:20]  # Ограничиваем количество
-            else:
-                self.logger.warning("⚠️ Категории не найдены, используем fallback")
-                return self.get_fallback_categories(content_type)
+            for step in range(1, self.harvest_max_steps + 1):
+                state = self.driver.execute_async_script(
+                    HARVEST_STEP_SCRIPT,
+                    ", ".join(CHANNEL_LINK_SELECTORS),
+                    self.harvest_quiet_ms,
+                    self.harvest_max_wait_ms,
+                )
+                added = state["after"] - state["before"]
+                steps.append({"step": step, "added": added, "elapsed": state["elapsed"] / 1000})
                 
+                if added <= 0 and state["atBottom"]:
+                    break
+        
         except Exception as e:
-            self.logger.error(f"❌ Ошибка при получении категорий: {e}")
-            return self.get_fallback_categories(content_type)
+            self.logger.warning(f"⚠️ Ошибка при прокрутке страницы {page}: {e}")
+        
+        total_time = time.perf_counter() - start_time
+        self.harvest_stats.append({"page": page, "steps": steps, "time": total_time})
+        
+        added_per_step = ", ".join(str(step["added"]) for step in steps)
+        self.logger.info(
+            f"🔄 Прокрутка страницы {page}: шагов {len(steps)}, "
+            f"добавлено по шагам [{added_per_step}], {total_time:.2f}с"
+        )
+        return steps
     
-    def get_fallback_categories(self, content_type: str) -> List[Dict[str, str]]:
-        """Fallback категории если не удалось получить с сайта"""
-        if content_type == "channels":
-            return [
-                {"name": "Новости", "url": f"{self.base_url}/channels/news", "type": "channels"},
-                {"name": "Развлечения", "url": f"{self.base_url}/channels/entertainment", "type": "channels"},
-                {"name": "Технологии", "url": f"{self.base_url}/channels/tech", "type": "channels"},
-                {"name": "Спорт", "url": f"{self.base_url}/channels/sport", "type": "channels"},
-                {"name": "Музыка", "url": f"{self.base_url}/channels/music", "type": "channels"},
-            ]
-        else:
-            return [
-                {"name": "Общение", "url": f"{self.base_url}/chats/communication", "type": "chats"},
-                {"name": "Игры", "url": f"{self.base_url}/chats/games", "type": "chats"},
-                {"name": "Работа", "url": f"{self.base_url}/chats/work", "type": "chats"},
-                {"name": "Криптовалюты", "url": f"{self.base_url}/chats/crypto", "type": "chats"},
-            ]
+    def drain_network_log(self):
+        """Очистка накопленных сетевых событий перед новой навигацией"""
+        try:
+            self.driver.get_log("performance")
+        except Exception:
+            pass
     
-    def parse_channel_data(self, url: str, max_pages: int = 1) -> List[Dict[str, str]]:
-        """Парсинг данных каналов с указанной страницы"""
-        results = []
+    def collect_network_listings(self) -> List[Dict[str, str]]:
+        """Сбор каналов из XHR/Fetch ответов tgstat.ru через Chrome DevTools"""
+        channels = []
+        seen_usernames = set()
         
         try:
-            self.logger.info(f"🔍 Парсинг: {url} (страниц: {max_pages})")
-            
-            for page in range(1, max_pages + 1):
-                try:
-                    page_url = f"{url}?page={page}" if page > 1 else url
-                    self.logger.info(f"📄 Обработка страницы {page}")
-                    
-                    self.driver.get(page_url)
-                    
-                    if not self.wait_for_cloudflare():
-                        self.logger.warning(f"⚠️ Проблемы с Cloudflare на странице {page}")
-                        continue
-                    
-                    time.sleep(random.uniform(2, 4))
-                    
-                    # Прокручиваем страницу для загрузки контента
-                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(2)
-                    
-                    page_results = self.extract_channels_from_page()
-                    results.extend(page_results)
-                    
-                    self.logger.info(f"✅ Страница {page}: найдено {len(page_results)} каналов")
-                    
-                    # Задержка между страницами
-                    if page < max_pages:
-                        delay = random.uniform(3, 6)
-                        self.logger.info(f"⏱️ Задержка {delay:.1f}с перед следующей страницей")
-                        time.sleep(delay)
-                        
-                except Exception as e:
-                    self.logger.error(f"❌ Ошибка на странице {page}: {e}")
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            self.logger.debug(f"Журнал performance недоступен: {e}")
+            return channels
+        
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+                if message.get("method") != "Network.responseReceived":
+                    continue
+                
+                params = message["params"]
+                response = params["response"]
+                mime_type = response.get("mimeType", "")
+                
+                if params.get("type") not in ("XHR", "Fetch"):
+                    continue
+                if "tgstat.ru" not in response.get("url", ""):
                     continue
+                if "json" not in mime_type and "html" not in mime_type:
+                    continue
+                
+                body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+                text = body.get("body", "")
+                if body.get("base64Encoded"):
+                    text = base64.b64decode(text).decode("utf-8", "replace")
+                
+                for record in extract_channels_from_payload(text, mime_type):
+                    if record["username"] not in seen_usernames:
+                        seen_usernames.add(record["username"])
+                        channels.append(record)
+            
+            except Exception as e:
+                self.logger.debug(f"Не удалось прочитать сетевой ответ: {e}")
+                continue
+        
+        return channels
+    
+    def get_extractors(self) -> Dict[str, Callable[[], List[Dict[str, str]]]]:
+        """Доступные способы извлечения каналов с текущей страницы"""
+        extractors = {
+            "script": self.extract_channels_bulk,
+            "elements": self.extract_channels_from_page,
+        }
+        if load_lxml():
+            extractors["html"] = self.extract_channels_from_source
+        return extractors
+    
+    def extract_channels(self) -> List[Dict[str, str]]:
+        """Извлечение каналов с текущей страницы выбранным способом"""
+        extractors = self.get_extractors()
+        mode = self.extraction_mode
+        
+        if mode not in extractors:
+            self.logger.warning(f"⚠️ Способ извлечения '{mode}' недоступен, используем 'script'")
+            mode = "script"
+        
+        start_time = time.perf_counter()
+        channels = extractors[mode]()
+        elapsed = time.perf_counter() - start_time
+        
+        self.extraction_timings.setdefault(mode, []).append(elapsed)
+        self.logger.info(f"⏱️ Извлечение ({mode}): {elapsed:.3f}с, записей: {len(channels)}")
+        
+        if self.compare_extraction:
+            self.compare_extraction_modes()
+        
+        return channels
+    
+    def compare_extraction_modes(self) -> Dict[str, float]:
+        """Замер времени извлечения всеми способами на текущей странице"""
+        extractors = self.get_extractors()
+        timings = {}
+        counts = {}
+        
+        for mode, extractor in extractors.items():
+            start_time = time.perf_counter()
+            counts[mode] = len(extractor())
+            timings[mode] = time.perf_counter() - start_time
+        
+        report = ", ".join(f"{mode}: {timings[mode]:.3f}с ({counts[mode]} зап.)" for mode in extractors)
+        self.logger.info(f"📊 Сравнение способов извлечения: {report}")
+        return timings
+    
+    def extract_channels_bulk(self) -> List[Dict[str, str]]:
+        """Извлечение всех карточек одним скриптом (один запрос к ChromeDriver)"""
+        channels = []
+        
+        try:
+            ordered = self.selector_cache.ordered("listing", CHANNEL_LINK_SELECTORS)
+            payload = json.loads(self.driver.execute_script(
+                BULK_EXTRACT_SCRIPT,
+                ordered,
+                CHANNEL_NAME_SELECTOR,
+                CHANNEL_SUBSCRIBERS_SELECTOR,
+            ) or "{}")
+            cards = payload.get("cards", [])
+            self.selector_cache.count("listing", ordered, payload.get("selector"))
+            
+            # Дополнительный поиск прямыми ссылками
+            if not cards:
+                page_source = self.driver.page_source
+                for username in re.findall(r'https?://t\.me/([a-zA-Z0-9_]+)', page_source):
+                    cards.append({"href": f"https://t.me/{username}", "context": False})
             
+            for card in cards:
+                record = build_channel_record(
+                    card["href"],
+                    card.get("name"),
+                    card.get("subscribers", []),
+                    has_context=card.get("context", True),
+                )
+                if record:
+                    channels.append(record)
+        
         except Exception as e:
-            self.logger.error(f"❌ Ошибка при парсинге {url}: {e}")
+            self.logger.error(f"❌ Ошибка при пакетном извлечении каналов: {e}")
         
-        return results
+        return channels
+    
+    def extract_channels_from_source(self) -> List[Dict[str, str]]:
+        """Извлечение каналов из page_source текущей страницы через lxml"""
+        try:
+            ordered = self.selector_cache.ordered("listing", CHANNEL_LINK_SELECTORS)
+            selector, channels = extract_channels_with_selector(self.driver.page_source, ordered)
+            self.selector_cache.count("listing", ordered, selector)
+            return channels
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка при разборе HTML: {e}")
+            return []
     
     def extract_channels_from_page(self) -> List[Dict[str, str]]:
         """Извлечение каналов с текущей страницы"""
         channels = []
         
         try:
-            # Множественные стратегии поиска
-            selectors = [
-                "a[href*='t.me/']",
-                "[data-channel]",
-                ".channel-item",
-                ".channel-link",
-                "a[href*='telegram']",
-            ]
-            
-            found_links = []
+            def find_links(selector: str) -> List[Tuple[object, str]]:
+                links = []
+                for element in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                    try:
+                        link = element.get_attribute("href")
+                        if link and "t.me/" in link:
+                            links.append((element, link))
+                    except Exception:
+                        continue
+                return links
             
-            # Пробуем каждый селектор
-            for selector in selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    
-                    for element in elements:
-                        try:
-                            link = element.get_attribute("href")
-                            if link and "t.me/" in link:
-                                found_links.append((element, link))
-                        except Exception:
-                            continue
-                            
-                except Exception:
-                    continue
+            # Пробуем селекторы, начиная с сработавшего в прошлый раз
+            _, found_links = self.selector_cache.find("listing", CHANNEL_LINK_SELECTORS, find_links)
             
             # Дополнительный поиск прямыми ссылками
             if not found_links:
@@ -520,48 +4036,27 @@ class TGStatParser:
             # Обрабатываем найденные ссылки
             for element, link in found_links:
                 try:
-                    # Извлекаем username
-                    username_match = re.search(r't\.me/([a-zA-Z0-9_]+)', link)
-                    if not username_match:
-                        continue
-                    
-                    username = username_match.group(1)
-                    
-                    # Получаем название и подписчиков
-                    name = "Неизвестный канал"
-                    subscribers = "Неизвестно"
+                    name = None
+                    subscriber_texts = []
                     
                     if element:
                         try:
-                            # Ищем название рядом с элементом
+                            # Ищем название и подписчиков рядом с элементом
                             parent = element.find_element(By.XPATH, "./..")
-                            name_candidates = parent.find_elements(By.CSS_SELECTOR, 
-                                ".title, .name, .channel-name, h3, h4, .text-lg, .font-bold")
+                            name_candidates = parent.find_elements(By.CSS_SELECTOR, CHANNEL_NAME_SELECTOR)
                             
                             if name_candidates:
-                                name = name_candidates[0].text.strip() or username
+                                name = name_candidates[0].text.strip()
                             
-                            # Ищем количество подписчиков
-                            sub_elements = parent.find_elements(By.CSS_SELECTOR, 
-                                ".subscribers, .members, .count, .number")
-                            
-                            for sub_elem in sub_elements:
-                                sub_text = sub_elem.text.strip()
-                                if any(keyword in sub_text.lower() for keyword in ['подписчик', 'member', 'участник', 'k', 'm']):
-                                    subscribers = sub_text
-                                    break
+                            sub_elements = parent.find_elements(By.CSS_SELECTOR, CHANNEL_SUBSCRIBERS_SELECTOR)
+                            subscriber_texts = [sub_elem.text.strip() for sub_elem in sub_elements]
                         
                         except Exception:
-                            name = username
-                    else:
-                        name = username
+                            name = ""
                     
-                    channels.append({
-                        "name": name,
-                        "url": link,
-                        "subscribers": subscribers,
-                        "username": username
-                    })
+                    record = build_channel_record(link, name, subscriber_texts, has_context=element is not None)
+                    if record:
+                        channels.append(record)
                     
                 except Exception as e:
                     self.logger.debug(f"Ошибка при обработке ссылки {link}: {e}")
@@ -572,6 +4067,115 @@ class TGStatParser:
         
         return channels
     
+    def log_run_summary(self):
+        """Вывод сводки по работе парсера за запуск"""
+        for mode, timings in self.extraction_timings.items():
+            if timings:
+                average = sum(timings) / len(timings)
+                self.logger.info(
+                    f"📊 Извлечение ({mode}): страниц {len(timings)}, "
+                    f"среднее {average:.3f}с, максимум {max(timings):.3f}с"
+                )
+        
+        total_pages = self.fetch_stats["http"] + self.fetch_stats["browser"]
+        if total_pages:
+            self.logger.info(
+                f"📊 Загрузка: без браузера {self.fetch_stats['http']} из {total_pages} "
+                f"({self.fetch_stats['http'] / total_pages:.0%}), через Selenium {self.fetch_stats['browser']}"
+            )
+        
+        for mode, stats in self.browser_mode_stats.items():
+            if stats["pages"]:
+                rate = stats["pages"] / stats["time"] * 60 if stats["time"] else 0
+                peak = f"{stats['peak_rss'] / 1024 / 1024:.0f} МБ" if stats["peak_rss"] else "н/д"
+                self.logger.info(f"📊 Браузер ({mode}): {rate:.1f} стр/мин, пиковый RSS {peak}")
+        
+        for profile, metrics in self.profile_stats.items():
+            average_bytes = sum(item["bytes"] for item in metrics) / len(metrics)
+            average_load = sum(item["loadMs"] for item in metrics) / len(metrics)
+            self.logger.info(
+                f"📊 Профиль {profile}: страниц {len(metrics)}, в среднем "
+                f"{average_bytes / 1024:.0f} КБ и {average_load / 1000:.2f}с на загрузку"
+            )
+        
+        if self.page_cache is not None:
+            cache_stats = self.page_cache.stats
+            served = cache_stats["hits"] + cache_stats["revalidated"]
+            lookups = served + cache_stats["misses"]
+            if lookups:
+                self.logger.info(
+                    f"📊 Кэш страниц: попаданий {cache_stats['hits']}, ревалидировано "
+                    f"{cache_stats['revalidated']}, промахов {cache_stats['misses']} "
+                    f"({served / lookups:.0%}), сэкономлено {cache_stats['bytes_saved'] / 1024:.0f} КБ"
+                )
+        
+        pagination = self.pagination_stats
+        if pagination["pages"]:
+            self.logger.info(
+                f"📊 Пагинация: обработано страниц {pagination['pages']}, лишних загрузок "
+                f"{pagination['wasted']}, предзагружено {pagination['prefetched']}, "
+                f"не загружено за концом листинга {pagination['trimmed']}"
+            )
+        
+        incremental = self.incremental_stats
+        if self.incremental:
+            self.logger.info(
+                f"📊 Инкрементальный обход: новых {incremental['new']}, изменившихся "
+                f"{incremental['changed']}, без изменений {incremental['unchanged']}, "
+                f"страниц не загружено {incremental['pages_saved']}"
+            )
+        
+        self.logger.info(
+            f"📊 Темп: текущий {self.pacer.rate():.1f} стр/мин (потолок {self.pacer.max_rate:.0f}), "
+            f"параллельность {self.pacer.concurrency}"
+        )
+        
+        if self.retry_stats["retries"] or self.circuit_breaker.trips:
+            self.logger.info(
+                f"📊 Повторы: {self.retry_stats['retries']}, восстановлено страниц "
+                f"{self.retry_stats['recovered']}, пропущено {self.retry_stats['abandoned']}, "
+                f"пауз размыкателя {self.circuit_breaker.trips} ({self.circuit_breaker.open_time:.0f}с)"
+            )
+        
+        if self.crash_stats["restarts"]:
+            self.logger.info(
+                f"📊 Сбои сессии: пересозданий {self.crash_stats['restarts']}, "
+                f"страниц возвращено в очередь {self.crash_stats['requeued']}"
+            )
+        
+        if self.watchdog.restarts or self.watchdog.high_water:
+            self.logger.info(
+                f"📊 Watchdog: перезапусков Chrome {self.watchdog.restarts}, "
+                f"максимум памяти {self.watchdog.high_water / 1024 / 1024:.0f} МБ"
+            )
+        
+        if self.page_wait_times:
+            self.logger.info(
+                f"📊 Ожидание готовности: страниц {len(self.page_wait_times)}, "
+                f"среднее {sum(self.page_wait_times) / len(self.page_wait_times):.2f}с, "
+                f"максимум {max(self.page_wait_times):.2f}с"
+            )
+        
+        if self.harvest_stats:
+            harvest_time = sum(stat["time"] for stat in self.harvest_stats)
+            harvest_steps = sum(len(stat["steps"]) for stat in self.harvest_stats)
+            self.logger.info(
+                f"📊 Прокрутка: страниц {len(self.harvest_stats)}, шагов {harvest_steps}, "
+                f"среднее время {harvest_time / len(self.harvest_stats):.2f}с"
+            )
+        
+        if self.capture_network:
+            self.logger.info(
+                f"📊 Захват сети: страниц из XHR {self.network_capture_stats['network']}, "
+                f"из DOM {self.network_capture_stats['dom']}"
+            )
+        
+        for page_type, counters in self.selector_cache.stats.items():
+            self.logger.info(
+                f"📊 Селекторы ({page_type}): попаданий {counters['hits']}, "
+                f"промахов {counters['misses']}, пропущено запросов {counters['skipped']}"
+            )
+    
     def save_results(self, results: List[Dict[str, str]], filename: str):
         """Сохранение результатов в файл"""
         try:
@@ -587,8 +4191,7 @@ class TGStatParser:
                 f.write(f"# Всего найдено: {len(results)}\n\n")
                 
                 for i, channel in enumerate(results, 1):
-                    line = f"{i}. {channel['name']} | {channel['url']} | {channel['subscribers']}\n"
-                    f.write(line)
+                    f.write(format_result_line(i, channel))
             
             self.logger.info(f"✅ Результаты сохранены: {filepath}")
             self.logger.info(f"📊 Всего каналов: {len(results)}")
@@ -602,23 +4205,29 @@ class TGStatParser:
         print("🎉 TGStat.ru Parser - Windows Edition")
         print("="*60)
         
+        if self.checkpoint_path.exists():
+            print("\n⏯️ Есть незавершенный обход. Продолжить: python main.py --resume")
+        
         while True:
             try:
                 print("\n📋 ГЛАВНОЕ МЕНЮ:")
                 print("1. Парсить каналы")
                 print("2. Парсить чаты")  
-                print("3. Тестовое подключение")
-                print("4. Выход")
+                print("3. Полный обход всех категорий")
+                print("4. Тестовое подключение")
+                print("5. Выход")
                 
-                choice = input("\n👉 Выберите действие (1-4): ").strip()
+                choice = input("\n👉 Выберите действие (1-5): ").strip()
                 
                 if choice == "1":
                     self.parse_content("channels")
                 elif choice == "2":
                     self.parse_content("chats")
                 elif choice == "3":
-                    self.test_connection()
+                    self.crawl_everything()
                 elif choice == "4":
+                    self.test_connection()
+                elif choice == "5":
                     print("\n👋 До свидания!")
                     break
                 else:
@@ -635,8 +4244,13 @@ class TGStatParser:
         try:
             print(f"\n🔍 Парсинг {content_type}...")
             
-            # Настраиваем WebDriver
-            if not self.setup_webdriver():
+            if not self.wait_for_connection():
+                return
+            
+            self.prepare_workspace()
+            
+            # WebDriver нужен сразу только без HTTP-загрузки
+            if self.fetch_backend == "selenium" and not self.ensure_driver():
                 print("❌ Не удалось настроить WebDriver")
                 return
             
@@ -671,10 +4285,11 @@ class TGStatParser:
             print("2. 10 страниц (средне)")
             print("3. 50+ страниц (долго)")
             print("4. Свое количество")
+            print("5. Авто (до последней страницы)")
             
             while True:
                 try:
-                    page_choice = input("\n👉 Выберите (1-4): ").strip()
+                    page_choice = input("\n👉 Выберите (1-5): ").strip()
                     
                     if page_choice == "1":
                         max_pages = 1
@@ -689,6 +4304,9 @@ class TGStatParser:
                         custom_pages = input("👉 Введите количество страниц: ").strip()
                         max_pages = int(custom_pages)
                         break
+                    elif page_choice == "5":
+                        max_pages = None
+                        break
                     else:
                         print("❌ Неверный выбор")
                 except ValueError:
@@ -696,31 +4314,101 @@ class TGStatParser:
             
             # Запускаем парсинг
             print(f"\n🚀 Начинаем парсинг: {selected_category['name']}")
-            print(f"📄 Страниц: {max_pages}")
+            print(f"📄 Страниц: {max_pages or 'авто'}")
             
-            results = self.parse_channel_data(selected_category['url'], max_pages)
+            filename = f"{content_type}_{selected_category['name'].replace(' ', '_')}"
+            checkpoint = CrawlCheckpoint.start(
+                self.checkpoint_path, kind="category", url=selected_category['url'],
+                name=selected_category['name'], content_type=content_type, max_pages=max_pages,
+                part=str(self.results_dir / f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt.part")
+            )
             
-            if results:
-                filename = f"{content_type}_{selected_category['name'].replace(' ', '_')}"
-                self.save_results(results, filename)
-                print(f"\n✅ Парсинг завершен! Найдено: {len(results)} каналов")
-            else:
-                print("\n❌ Данные не найдены")
+            self.parse_channel_data(selected_category['url'], max_pages, checkpoint)
+            self.finish_checkpoint(checkpoint)
                 
         except Exception as e:
             self.logger.error(f"❌ Ошибка при парсинге: {e}")
             print(f"❌ Произошла ошибка: {e}")
+    
+    def finish_checkpoint(self, checkpoint: CrawlCheckpoint):
+        """Итоговый файл результатов обхода категории и отчет о нем"""
+        self.log_run_summary()
         
-        finally:
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
+        total = checkpoint.state["offset"]
+        final_path = checkpoint.finalize()
+        
+        if final_path:
+            self.logger.info(f"✅ Результаты сохранены: {final_path}")
+            self.logger.info(f"📊 Всего каналов: {total}")
+            print(f"\n✅ Парсинг завершен! Найдено: {total} каналов")
+        elif self.incremental:
+            print("\nℹ️ Новых и изменившихся каналов нет")
+        else:
+            print("\n❌ Данные не найдены")
+    
+    def resume_crawl(self):
+        """Продолжение обхода, прерванного после последней контрольной точки"""
+        checkpoint = CrawlCheckpoint.load(self.checkpoint_path)
+        if checkpoint is None:
+            print("ℹ️ Незавершенного обхода нет")
+            return
+        
+        state = checkpoint.state
+        print(f"\n⏯️ Продолжение обхода от {state['updated_at']}: {state.get('name', 'все категории')}")
+        
+        try:
+            if not self.wait_for_connection():
+                return
+            
+            self.prepare_workspace()
+            
+            if self.fetch_backend == "selenium" and not self.ensure_driver():
+                print("❌ Не удалось настроить WebDriver")
+                return
+            
+            if state["kind"] == "full":
+                total = self.crawl_all_categories(state["max_pages"], checkpoint=checkpoint)
+                self.log_run_summary()
+                print(f"\n✅ Полный обход завершен! Найдено: {total} записей")
+                return
+            
+            checkpoint.restore_output()
+            self.parse_channel_data(state["url"], state["max_pages"], checkpoint)
+            self.finish_checkpoint(checkpoint)
+            
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка при продолжении обхода: {e}")
+            print(f"❌ Произошла ошибка: {e}")
+    
+    def crawl_everything(self):
+        """Полный обход всех категорий каналов и чатов"""
+        try:
+            print("\n🗺️ Полный обход всех категорий...")
+            
+            if not self.wait_for_connection():
+                return
+            
+            self.prepare_workspace()
+            
+            if self.fetch_backend == "selenium" and not self.ensure_driver():
+                print("❌ Не удалось настроить WebDriver")
+                return
+            
+            total = self.crawl_all_categories()
+            self.log_run_summary()
+            print(f"\n✅ Полный обход завершен! Найдено: {total} записей")
+            
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка при полном обходе: {e}")
+            print(f"❌ Произошла ошибка: {e}")
     
     def test_connection(self):
         """Тестирование соединения"""
         print("\n🧪 ТЕСТИРОВАНИЕ СОЕДИНЕНИЯ")
         print("-" * 40)
         
+        self.prepare_workspace()
+        
         # Проверка интернета
         if not self.check_internet_connection():
             print("❌ Нет интернет соединения")
@@ -730,8 +4418,12 @@ class TGStatParser:
         chrome_version = self.get_chrome_version()
         print(f"🔍 Версия Chrome: {chrome_version}")
         
-        # Проверка WebDriver
-        if self.setup_webdriver():
+        # Время поиска ChromeDriver без манифеста и с ним
+        timings = self.benchmark_driver_resolution()
+        print(f"⏱️ Поиск ChromeDriver: без манифеста {timings['cold']:.3f}с, с манифестом {timings['warm']:.3f}с")
+        
+        # Проверка WebDriver (сессия остается прогретой для следующих действий)
+        if self.ensure_driver():
             print("✅ WebDriver настроен успешно")
             
             try:
@@ -745,10 +4437,6 @@ class TGStatParser:
                     
             except Exception as e:
                 print(f"❌ Ошибка подключения: {e}")
-            
-            finally:
-                self.driver.quit()
-                self.driver = None
         else:
             print("❌ Ошибка настройки WebDriver")
     
@@ -762,9 +4450,54 @@ class TGStatParser:
             self.driver = None
 
 
+def parse_args(argv: Optional[List[str]] = None):
+    """Разбор аргументов командной строки"""
+    import argparse
+    
+    arg_parser = argparse.ArgumentParser(description="TGStat.ru Parser")
+    arg_parser.add_argument("--check-connection", choices=["background", "blocking", "off"],
+                            default="background",
+                            help="проверка интернета: в фоне (по умолчанию), до меню или без проверки")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            help="выдавать только новые и изменившиеся каналы, останавливаясь на известных")
+    arg_parser.add_argument("--incremental-stop-pages", type=int, default=2,
+                            help="сколько страниц подряд только с известными каналами завершают категорию")
+    arg_parser.add_argument("--resume", action="store_true",
+                            help="продолжить прерванный обход с последней контрольной точки")
+    arg_parser.add_argument("--role", choices=["menu", "coordinator", "worker"], default="menu",
+                            help="интерактивное меню, координатор или воркер распределенного полного обхода")
+    arg_parser.add_argument("--jobs", default=str(Path("cache") / "jobs.sqlite3"),
+                            help="файл общей очереди задач (может лежать на общем диске)")
+    arg_parser.add_argument("--max-pages", type=int, default=None,
+                            help="предел страниц на категорию при полном обходе (по умолчанию - автопагинация)")
+    arg_parser.add_argument("--lease", type=float, default=120,
+                            help="время аренды задачи воркером, секунд")
+    arg_parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}",
+                            help="имя воркера в очереди")
+    arg_parser.add_argument("--no-wal", action="store_true",
+                            help="обычный журнал SQLite вместо WAL (для сетевых дисков)")
+    arg_parser.add_argument("--profile", choices=["full", "headless"], default="full",
+                            help="профиль браузера: окно 1920x1080 или headless с блокировкой лишних ресурсов")
+    arg_parser.add_argument("--fetch-backend", choices=["http", "async", "selenium"], default="http",
+                            help="загрузка страниц: HTTP с переходом на браузер, параллельно через httpx "
+                                 "или только браузер")
+    arg_parser.add_argument("--pool-size", type=int, default=1,
+                            help="число сессий WebDriver в пуле для --fetch-backend selenium (1 - без пула)")
+    arg_parser.add_argument("--tabs", type=int, default=1,
+                            help="число вкладок в одной сессии Chrome (1 - одна вкладка)")
+    arg_parser.add_argument("--capture-network", action="store_true",
+                            help="брать каналы из XHR/JSON ответов листинга через Chrome DevTools")
+    arg_parser.add_argument("--extraction", choices=["script", "elements", "html", "compare"], default="script",
+                            help="способ извлечения каналов в браузере; compare - замерить и сравнить все способы")
+    arg_parser.add_argument("--max-rate", type=float, default=30.0,
+                            help="потолок темпа запросов, страниц в минуту (на процесс)")
+    return arg_parser.parse_args(argv)
+
+
 def main():
     """Главная функция"""
     parser = None
+    args = parse_args()
     
     try:
         # Проверка Python версии
@@ -776,14 +4509,50 @@ def main():
         
         # Создаем парсер
         parser = TGStatParser()
+        parser.incremental = args.incremental
+        parser.incremental_stop_pages = args.incremental_stop_pages
+        parser.browser_profile = args.profile
+        parser.fetch_backend = args.fetch_backend
+        parser.driver_pool_size = max(args.pool_size, 1)
+        parser.tab_count = max(args.tabs, 1)
+        parser.capture_network = args.capture_network
+        parser.pacer.set_max_rate(args.max_rate)
+        if args.extraction == "compare":
+            parser.compare_extraction = True
+        else:
+            parser.extraction_mode = args.extraction
         
-        # Проверяем интернет
-        if not parser.check_internet_connection():
-            print("❌ Отсутствует интернет соединение")
+        # Проверяем интернет: в фоне результат ожидается перед первым обходом
+        if args.check_connection == "blocking":
+            if not parser.check_internet_connection():
+                print("❌ Отсутствует интернет соединение")
+                return
+        elif args.check_connection == "background":
+            parser.start_connection_check()
+        
+        if args.resume:
+            parser.resume_crawl()
+            return
+        
+        if args.role == "menu":
+            # Запускаем интерактивное меню
+            parser.interactive_menu()
+            return
+        
+        if not parser.wait_for_connection():
             return
+        parser.prepare_workspace()
         
-        # Запускаем интерактивное меню
-        parser.interactive_menu()
+        store = JobStore(Path(args.jobs), lease_seconds=args.lease, max_attempts=parser.max_page_retries + 1,
+                         wal=not args.no_wal)
+        try:
+            if args.role == "coordinator":
+                parser.run_coordinator(store, args.max_pages)
+                parser.log_run_summary()
+            else:
+                parser.run_worker(store, args.worker_id)
+        finally:
+            store.close()
         
     except KeyboardInterrupt:
         print("\n\n⚠️ Программа прервана пользователем")
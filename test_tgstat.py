@@ -5,13 +5,19 @@
 Быстрая проверка основных функций без полного запуска
 """
 
+import logging
 import os
 import sys
 import requests
 import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
 import json
 
+PROJECT_DIR = Path(__file__).resolve().parent
+
 
 def test_python_version():
     """Проверка версии Python"""
@@ -199,6 +205,744 @@ def test_selenium_basic():
         return False
 
 
+# Сохраненная страница листинга и ожидаемый результат ее разбора
+LISTING_FIXTURE = PROJECT_DIR / "tests" / "fixtures" / "tgstat_listing.html"
+
+LISTING_EXPECTED = [
+    {"name": "Tech News Daily", "url": "https://t.me/tech_news_daily",
+     "subscribers": "128 450 подписчиков", "username": "tech_news_daily"},
+    {"name": "Python Digest", "url": "https://t.me/python_digest",
+     "subscribers": "54.2k подписчиков", "username": "python_digest"},
+    {"name": "DevOps по-русски", "url": "https://t.me/devops_ru",
+     "subscribers": "7 310 участников", "username": "devops_ru"},
+    {"name": "ml_notes", "url": "https://t.me/ml_notes",
+     "subscribers": "Неизвестно", "username": "ml_notes"},
+]
+
+
+def test_listing_extraction():
+    """Проверка разбора сохраненной страницы листинга без браузера"""
+    print("\n📄 Проверка разбора страницы листинга...")
+    
+    main = load_main()
+    
+    if not main.load_lxml():
+        print("❌ lxml не установлен. Выполните: pip install lxml cssselect")
+        return False
+    
+    html = LISTING_FIXTURE.read_text(encoding="utf-8")
+    runs = 50
+    start = time.perf_counter()
+    for _ in range(runs):
+        records = main.extract_channels_from_html(html)
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"   Разбор {LISTING_FIXTURE.name}: {elapsed * 1000:.2f} мс на страницу ({runs} прогонов)")
+    
+    # assert, а не return False: расхождение должно ронять и запуск через pytest
+    if records != LISTING_EXPECTED:
+        print(f"❌ Получено {len(records)} записей, ожидалось {len(LISTING_EXPECTED)}:")
+        for record in records:
+            print(f"   {record}")
+    assert records == LISTING_EXPECTED, "записи листинга не совпадают с ожидаемыми"
+    
+    print(f"✅ Извлечено {len(records)} каналов, записи совпадают с ожидаемыми")
+    return True
+
+
+# Адрес категории для обходов без сети
+STUB_CATEGORY_URL = "https://tgstat.ru/ratings/channels/tech"
+
+
+def load_main():
+    """Импорт main.py из каталога проекта"""
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    import main
+    return main
+
+
+@contextmanager
+def working_directory(path):
+    """Временная смена рабочего каталога (парсер пишет cache/ и results/ относительно него)"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def stub_listing_html(page: int, pages: int) -> str:
+    """Страница листинга с тремя карточками и пагинатором из одной ссылки "Далее"
+
+    Страницы после pages пустые.
+    """
+    cards = "".join(
+        f'<div class="card"><a href="https://t.me/c{page}_{index}">x</a><div class="title">Канал {page}.{index}</div>'
+        f'<div class="count">{page}{index}00 подписчиков</div></div>'
+        for index in range(3)
+    ) if page <= pages else ""
+    pager = f'<a href="/ratings/channels/tech?page={page + 1}">Далее</a>' if page < pages else ""
+    return f"<html><body><div class='list'>{cards}</div>{pager}</body></html>"
+
+
+class StubFetcher:
+    """Замена HttpFetcher: отдает stub_listing_html и запоминает запрошенные страницы
+
+    failures - сколько раз подряд каждая страница отвечает ошибкой (None),
+    interrupt_at - на какой странице имитировать Ctrl+C.
+    """
+
+    def __init__(self, pages: int, failures=None):
+        self.pages = pages
+        self.failures = dict(failures or {})
+        self.interrupt_at = None
+        self.requested = []
+        self.stats = {"requests": 0, "challenges": 0, "errors": 0, "bytes": 0}
+
+    def fetch(self, url: str):
+        page = int(url.split("page=")[1]) if "page=" in url else 1
+        if page == self.interrupt_at:
+            raise KeyboardInterrupt
+        self.requested.append(page)
+        self.stats["requests"] += 1
+        if self.failures.get(page):
+            self.failures[page] -= 1
+            self.stats["errors"] += 1
+            return None
+        return stub_listing_html(page, self.pages)
+
+
+def stub_parser(pages: int, failures=None):
+    """Парсер с загрузкой страниц через StubFetcher, без пауз, кэша и браузера"""
+    main = load_main()
+    parser = main.TGStatParser()
+    parser.fetch_backend = "http"
+    parser.page_cache_enabled = False
+    parser.prefetch_pages = False
+    parser.pacer = main.PacingController(initial_delay=0.0, max_rate=1e6)
+    parser.retry_base_delay = 0.01
+    parser.retry_max_delay = 0.05
+    parser.http_fetcher = StubFetcher(pages, failures)
+    parser.fetch_page_records_browser = lambda page_url, page: None
+    parser.recover_dead_session = lambda: False
+    return parser, parser.http_fetcher
+
+
+def test_pager_next_link():
+    """Проверка пагинации, когда пагинатор показывает только ссылку "Далее\""""
+    print("\n📑 Проверка пагинатора из одной ссылки...")
+    
+    with tempfile.TemporaryDirectory() as work_dir, working_directory(work_dir):
+        # Явное число страниц: ссылка на стр. 2 не должна обрывать обход
+        parser, fetcher = stub_parser(pages=5)
+        records = parser.parse_channel_data(STUB_CATEGORY_URL, 5)
+        assert fetcher.requested == [1, 2, 3, 4, 5], fetcher.requested
+        assert len(records) == 15, len(records)
+        
+        # Автопагинация: обход идет до первой пустой страницы
+        parser, fetcher = stub_parser(pages=5)
+        records = parser.parse_channel_data(STUB_CATEGORY_URL, None)
+        assert fetcher.requested == [1, 2, 3, 4, 5, 6], fetcher.requested
+        assert [record["username"] for record in records][::3] == [f"c{page}_0" for page in range(1, 6)]
+    
+    print("✅ Обход не обрывается на странице из ссылки \"Далее\"")
+    return True
+
+
+def test_page_order_after_retry():
+    """Проверка, что страница, полученная после повтора, выдается на своем месте"""
+    print("\n🔁 Проверка порядка страниц после повтора...")
+    
+    expected = [f"c{page}_{index}" for page in range(1, 7) for index in range(3)]
+    with tempfile.TemporaryDirectory() as work_dir, working_directory(work_dir):
+        # Последовательный обход: страница 2 повторяется после страницы 3
+        parser, fetcher = stub_parser(pages=6, failures={2: 1})
+        records = parser.parse_channel_data(STUB_CATEGORY_URL, None)
+        assert [record["username"] for record in records] == expected
+        assert fetcher.requested.count(2) == 2, fetcher.requested
+        
+        # Обход окнами: страница 2 повторяется в следующем окне
+        parser, fetcher = stub_parser(pages=6, failures={2: 1})
+        parser.crawl_batch_size = lambda: 4
+        records = parser.parse_listing_windows(STUB_CATEGORY_URL, 10)
+        assert [record["username"] for record in records] == expected
+        assert fetcher.requested.count(2) == 2, fetcher.requested
+    
+    print("✅ Записи выдаются в порядке страниц")
+    return True
+
+
+def test_retry_and_circuit_breaker():
+    """Проверка повторов страниц, задержки повтора и размыкателя цепи"""
+    print("\n🔌 Проверка повторов и размыкателя цепи...")
+    
+    main = load_main()
+    logger = logging.getLogger("test_tgstat")
+    
+    # Задержка растет вдвое до потолка, случайна только верхняя половина
+    for attempt, full in ((1, 1.0), (2, 2.0), (3, 4.0), (5, 10.0), (20, 10.0)):
+        for _ in range(20):
+            delay = main.backoff_delay(attempt, 1.0, 10.0)
+            assert full / 2 <= delay <= full, (attempt, delay)
+    
+    # closed -> open по доле ошибок, но не раньше min_samples исходов
+    breaker = main.CircuitBreaker(window=4, failure_threshold=0.5, min_samples=4, cooldown=0)
+    assert not breaker.record(False) and not breaker.record(False) and not breaker.record(True)
+    assert breaker.state == "closed"
+    assert breaker.record(True) and breaker.state == "open" and breaker.trips == 1
+    
+    # open -> half_open после паузы; ошибка пробы снова размыкает цепь
+    breaker.wait_if_open(logger)
+    assert breaker.state == "half_open"
+    assert breaker.record(False) and breaker.state == "open" and breaker.trips == 2
+    
+    # half_open -> closed после успешной пробы, окно начинается заново
+    breaker.wait_if_open(logger)
+    assert not breaker.record(True) and breaker.state == "closed"
+    assert breaker.failure_rate() == 0.0
+    breaker.wait_if_open(logger)
+    assert breaker.state == "closed"
+    
+    with tempfile.TemporaryDirectory() as work_dir, working_directory(work_dir):
+        # Страница 2 получена со второй попытки, страница 3 не отвечает вовсе
+        parser, fetcher = stub_parser(pages=4, failures={2: 1, 3: 10})
+        parser.max_page_retries = 2
+        parser.circuit_breaker = main.CircuitBreaker(cooldown=0)
+        records = parser.parse_channel_data(STUB_CATEGORY_URL, 4)
+        
+        assert fetcher.requested.count(2) == 2 and fetcher.requested.count(3) == 3, fetcher.requested
+        assert parser.retry_stats == {"retries": 3, "recovered": 1, "abandoned": 1}, parser.retry_stats
+        assert [record["username"][1] for record in records] == ["1"] * 3 + ["2"] * 3 + ["4"] * 3
+    
+    print("✅ Повторы и размыкатель цепи работают")
+    return True
+
+
+def test_pacing_controller():
+    """Проверка адаптивного темпа: потолок, реакция на ошибки и интервалы между потоками"""
+    print("\n🚦 Проверка адаптивного темпа...")
+    
+    main = load_main()
+    import threading
+    
+    # Быстрые ответы ускоряют обход, но не выше max_rate
+    pacer = main.PacingController(initial_delay=6.0, max_rate=30.0, additive_step=0.5, max_concurrency=4)
+    for _ in range(50):
+        pacer.on_success(0.1)
+        assert pacer.delay >= 60.0 / 30.0, pacer.delay
+    assert pacer.delay == 2.0 and pacer.rate() == 30.0 and pacer.concurrency == 4
+    
+    # Медленный ответ замедляет, не добавляя параллельности
+    pacer.on_success(pacer.slow_latency + 1)
+    assert pacer.delay == 3.0 and pacer.concurrency == 4
+    
+    # Ошибка удваивает интервал (до max_delay) и вдвое снижает параллельность
+    pacer.on_failure()
+    assert pacer.delay == 6.0 and pacer.concurrency == 2
+    pacer.on_failure()
+    assert pacer.concurrency == 1
+    for _ in range(10):
+        pacer.on_failure()
+    assert pacer.delay == pacer.max_delay and pacer.concurrency == 1
+    
+    # Новый потолок сразу поднимает слишком короткий интервал
+    pacer = main.PacingController(initial_delay=1.0, max_rate=30.0)
+    pacer.set_max_rate(10.0)
+    assert pacer.delay == 6.0 and pacer.min_delay == 6.0
+    
+    # Слоты, зарезервированные из разных потоков, идут не чаще delay (джиттер +-10%)
+    pacer = main.PacingController(initial_delay=0.02, max_rate=1e6)
+    pauses = []
+    lock = threading.Lock()
+    
+    def take_slots():
+        for _ in range(5):
+            pause = pacer.reserve()
+            with lock:
+                pauses.append(pause)
+    
+    begin = time.monotonic()
+    threads = [threading.Thread(target=take_slots) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # 20 слотов подряд занимают не меньше 20 интервалов, даже если их брали одновременно
+    assert len(pauses) == 20 and min(pauses) >= 0
+    assert pacer.next_start - begin >= 20 * 0.02 * 0.9, pacer.next_start - begin
+    
+    print("✅ Темп держится в заданных пределах")
+    return True
+
+
+def test_page_cache():
+    """Проверка кэша страниц: TTL, условные заголовки, ответ 304 и вытеснение по размеру"""
+    print("\n🗄️ Проверка кэша страниц...")
+    
+    main = load_main()
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        cache = main.PageCache(Path(work_dir) / "pages", ttl=60)
+        url = "https://tgstat.ru/ratings/channels/tech"
+        assert cache.get(url) is None
+        
+        # Свежесть по TTL и заголовки ревалидации
+        cache.put(url, "<html>страница</html>", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+        body, meta = cache.get(url)
+        assert body == "<html>страница</html>" and cache.is_fresh(meta)
+        assert cache.conditional_headers(meta) == {
+            "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+        }
+        assert cache.conditional_headers({"etag": None, "last_modified": None}) == {}
+        
+        meta["fetched_at"] -= 61
+        assert not cache.is_fresh(meta)
+        
+        # Устаревшая запись ревалидируется: 304 продлевает TTL и отдает тело из кэша
+        body_path, meta_path = cache._paths(url)
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        fetcher = main.HttpFetcher("test-agent", cache=cache)
+        sent = {}
+        
+        def not_modified(request_url, **kwargs):
+            sent.update(kwargs["headers"])
+            return StubResponse(304, "")
+        
+        fetcher.session.get = not_modified
+        assert fetcher.fetch(url) == "<html>страница</html>"
+        assert sent["If-None-Match"] == '"v1"'
+        assert cache.stats["revalidated"] == 1
+        
+        body, meta = cache.get(url)
+        assert cache.is_fresh(meta) and meta["etag"] == '"v1"'
+        
+        # Свежая запись отдается без запроса
+        def unexpected(request_url, **kwargs):
+            raise AssertionError("лишний запрос")
+        
+        fetcher.session.get = unexpected
+        assert fetcher.fetch(url) == "<html>страница</html>" and cache.stats["hits"] == 1
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        # LRU по размеру: недавно прочитанная запись переживает вытеснение
+        cache = main.PageCache(Path(work_dir) / "pages")
+        urls = [f"https://tgstat.ru/page{index}" for index in range(3)]
+        bodies = [os.urandom(2000).hex() for _ in urls]
+        
+        cache.put(urls[0], bodies[0])
+        size = cache._paths(urls[0])[0].stat().st_size
+        cache.max_bytes = int(size * 2.5)
+        cache.put(urls[1], bodies[1])
+        
+        now = time.time()
+        os.utime(cache._paths(urls[0])[0], (now - 100, now - 100))
+        os.utime(cache._paths(urls[1])[0], (now - 50, now - 50))
+        assert cache.get(urls[0]) is not None
+        
+        scans = []
+        original_scan = cache._scan
+        cache._scan = lambda: scans.append(1) or original_scan()
+        cache.put(urls[2], bodies[2])
+        
+        assert cache.get(urls[1]) is None and not cache._paths(urls[1])[1].exists()
+        assert cache.get(urls[0]) is not None and cache.get(urls[2]) is not None
+        assert cache.total_bytes == sum(size for _, size, _ in original_scan()) <= cache.max_bytes
+        
+        # Пока лимит не превышен, каталог не просматривается
+        scans.clear()
+        cache.max_bytes = size * 10
+        for index in range(3):
+            cache.put(f"https://tgstat.ru/extra{index}", os.urandom(2000).hex())
+        assert not scans, "каталог просматривался при каждой записи"
+        assert cache.total_bytes == sum(size for _, size, _ in original_scan())
+    
+    print("✅ Кэш страниц работает")
+    return True
+
+
+class StubBulkDriver:
+    """Драйвер, чей BULK_EXTRACT_SCRIPT сработал на заданном селекторе"""
+    
+    def __init__(self, selector):
+        self.selector = selector
+        self.page_source = "<html></html>"
+        self.sent_selectors = None
+    
+    def execute_script(self, script, link_selectors, *args):
+        self.sent_selectors = list(link_selectors)
+        cards = [{"href": "https://t.me/bulk_channel", "name": "Bulk", "subscribers": ["1 000"]}]
+        return json.dumps({"selector": self.selector, "cards": cards if self.selector else []})
+
+
+def test_selector_stats():
+    """Проверка учета попаданий селекторов при разборе без браузера и пакетном извлечении"""
+    print("\n🎯 Проверка статистики селекторов...")
+    
+    main = load_main()
+    
+    with tempfile.TemporaryDirectory() as work_dir, working_directory(work_dir):
+        # Две страницы с карточками и пустая третья
+        parser, fetcher = stub_parser(pages=2)
+        parser.parse_channel_data(STUB_CATEGORY_URL, 3)
+        stats = parser.selector_cache.stats["listing"]
+        selectors = len(main.CHANNEL_LINK_SELECTORS)
+        assert stats == {"hits": 2, "misses": selectors, "skipped": 2 * (selectors - 1)}, stats
+        assert parser.selector_cache.winners["listing"] == main.CHANNEL_LINK_SELECTORS[0]
+        
+        # Скрипт сработал на втором селекторе: один промах, он же становится первым
+        parser.driver = StubBulkDriver(main.CHANNEL_LINK_SELECTORS[1])
+        assert [record["username"] for record in parser.extract_channels_bulk()] == ["bulk_channel"]
+        assert stats == {"hits": 3, "misses": selectors + 1, "skipped": 3 * (selectors - 1) - 1}, stats
+        assert parser.selector_cache.ordered("listing", main.CHANNEL_LINK_SELECTORS)[0] == main.CHANNEL_LINK_SELECTORS[1]
+        
+        # Ни один селектор не сработал
+        parser.driver = StubBulkDriver(None)
+        parser.extract_channels_bulk()
+        assert parser.driver.sent_selectors[0] == main.CHANNEL_LINK_SELECTORS[1]
+        assert stats["hits"] == 3 and stats["misses"] == 2 * selectors + 1, stats
+    
+    print("✅ Попадания и промахи селекторов учитываются")
+    return True
+
+
+def test_async_crawler():
+    """Проверка асинхронного обхода: лимит параллельности и один клиент на весь обход"""
+    print("\n⚡ Проверка асинхронного обхода...")
+    
+    main = load_main()
+    if not main.load_httpx() or not main.load_lxml():
+        print("⚠️ httpx или lxml не установлены, проверка пропущена")
+        return True
+    import asyncio
+    import httpx
+    
+    in_flight = {"now": 0, "max": 0, "requests": 0}
+    
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["requests"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        page = int(request.url.params.get("page", "1"))
+        return httpx.Response(200, text=stub_listing_html(page, 6))
+    
+    with tempfile.TemporaryDirectory() as work_dir, working_directory(work_dir):
+        parser, _ = stub_parser(pages=6)
+        parser.fetch_backend = "async"
+        parser.crawl_batch_size = lambda: 3
+        parser.pacer.max_concurrency = 2
+        parser.pacer.concurrency = 2
+        parser.async_concurrency = 2
+        
+        crawler = main.AsyncCrawler("test-agent", concurrency=8, pacer=parser.pacer)
+        crawler.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client = crawler.client
+        parser.async_crawler = crawler
+        
+        runs = []
+        original_run = crawler.run
+        crawler.run = lambda tasks: runs.append((crawler.loop, crawler.client)) or original_run(tasks)
+        
+        records = parser.parse_listing_windows(STUB_CATEGORY_URL, 10)
+    
+    expected = [f"c{page}_{index}" for page in range(1, 7) for index in range(3)]
+    assert [record["username"] for record in records] == expected
+    
+    # Несколько окон - один клиент и один цикл событий, закрытые после обхода
+    assert len(runs) >= 2 and all(run_client is client for _, run_client in runs), runs
+    assert len({id(loop) for loop, _ in runs[1:]}) == 1
+    assert client.is_closed and crawler.loop is None and parser.async_crawler is None
+    
+    # Общий лимит 8, но регулятор темпа разрешает только 2 запроса одновременно
+    assert in_flight["max"] == 2, in_flight
+    
+    print(f"✅ {in_flight['requests']} запросов через один клиент, одновременно не больше 2")
+    return True
+
+
+class StubResponse:
+    """Ответ requests для HttpFetcher без сети"""
+    
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = {}
+
+
+def test_challenge_detection():
+    """Проверка распознавания страниц Cloudflare и ответа 404"""
+    print("\n🛡️ Проверка распознавания страниц проверки...")
+    
+    main = load_main()
+    
+    # Обычная страница за Cloudflare подключает скрипт challenge-platform
+    normal = ('<html><head><title>Каналы - TGStat</title>'
+              '<script src="/cdn-cgi/challenge-platform/scripts/jsd/main.js"></script></head>'
+              '<body><a href="https://t.me/durov">Durov</a></body></html>')
+    challenge = '<html><head><title>Just a moment...</title></head><body><div id="cf-challenge"></div></body></html>'
+    blocked = '<html><body>Sorry, you have been blocked. Cloudflare Ray ID: 1</body></html>'
+    
+    assert not main.is_challenge_page(normal, 200)
+    assert main.is_challenge_page(challenge, 200)
+    assert main.is_challenge_page(challenge, 503)
+    assert main.is_challenge_page(blocked, 403)
+    assert not main.is_challenge_page("<html><body>Not found</body></html>", 404)
+    
+    fetcher = main.HttpFetcher("test-agent")
+    responses = {
+        "https://tgstat.ru/ok": StubResponse(200, normal),
+        "https://tgstat.ru/missing": StubResponse(404, "<html><body>Not found</body></html>"),
+        "https://tgstat.ru/challenge": StubResponse(503, challenge),
+    }
+    fetcher.session.get = lambda url, **kwargs: responses[url]
+    
+    assert fetcher.fetch("https://tgstat.ru/ok") == normal
+    assert fetcher.fetch("https://tgstat.ru/missing") == ""
+    assert fetcher.fetch("https://tgstat.ru/challenge") is None
+    assert fetcher.stats["challenges"] == 1
+    
+    print("✅ Скрипты Cloudflare на обычной странице не считаются проверкой, 404 - пустой листинг")
+    return True
+
+
+class StubTabsDriver:
+    """WebDriver с вкладками, в которых переход фиксируется через несколько опросов
+    
+    До фиксации location.href вкладки остается прежним, как в Chrome.
+    """
+    
+    def __init__(self, start_url: str, commit_after: int = 2):
+        self.commit_after = commit_after
+        self.tabs = {"tab-0": {"url": start_url, "target": None, "polls": 0}}
+        self.current_window_handle = "tab-0"
+        self.switch_to = self
+    
+    def window(self, handle: str):
+        self.current_window_handle = handle
+    
+    def new_window(self, kind: str):
+        handle = f"tab-{len(self.tabs)}"
+        self.tabs[handle] = {"url": "about:blank", "target": None, "polls": 0}
+        self.current_window_handle = handle
+    
+    @property
+    def current_url(self) -> str:
+        return self.tabs[self.current_window_handle]["url"]
+    
+    def execute_script(self, script: str, *args):
+        tab = self.tabs[self.current_window_handle]
+        if script.startswith("window.location.href"):
+            tab["target"], tab["polls"] = args[0], 0
+            return None
+        
+        if tab["target"] is not None:
+            tab["polls"] += 1
+            if tab["polls"] >= self.commit_after:
+                tab["url"], tab["target"] = tab["target"], None
+        return {"readyState": "complete", "challenge": False, "listing": True, "url": tab["url"]}
+    
+    def close(self):
+        pass
+
+
+def test_tabs_wait_for_navigation():
+    """Проверка, что вкладка читается только после перехода на нужную страницу"""
+    print("\n🗂️ Проверка готовности вкладок...")
+    
+    main = load_main()
+    
+    with tempfile.TemporaryDirectory() as work_dir, working_directory(work_dir):
+        parser = main.TGStatParser()
+        parser.tab_count = 2
+        parser.page_ready_poll = 0.0
+        parser.driver = StubTabsDriver("https://tgstat.ru/")
+        parser.ensure_driver = lambda: True
+        parser.harvest_lazy_content = lambda page: []
+        
+        # Карточки той страницы, что сейчас открыта во вкладке
+        def extract_channels():
+            current_url = parser.driver.current_url
+            page = current_url.split("page=")[1] if "page=" in current_url else "1"
+            return [{"name": page, "url": current_url, "subscribers": "", "username": f"p{page}"}]
+        
+        parser.extract_channels = extract_channels
+        
+        tasks = [(STUB_CATEGORY_URL, page) for page in range(1, 6)]
+        page_results = parser.fetch_pages_tabs(tasks)
+    
+    for url, page in tasks:
+        assert page_results[(url, page)][0]["username"] == f"p{page}", (page, page_results[(url, page)])
+    
+    print("✅ Каждая страница извлечена из своей вкладки после перехода")
+    return True
+
+
+def test_job_store():
+    """Проверка общей очереди: аренда, возврат, лимит попыток и завершение обхода"""
+    print("\n🧭 Проверка очереди распределенного обхода...")
+    
+    import threading
+    
+    main = load_main()
+    url = STUB_CATEGORY_URL
+    records = [{"name": "n", "url": "https://t.me/a", "subscribers": "1", "username": "a"}]
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = Path(work_dir) / "jobs.sqlite3"
+        coordinator = main.JobStore(path, lease_seconds=0.2, max_attempts=2)
+        worker = main.JobStore(path, lease_seconds=0.2, max_attempts=2)
+        try:
+            assert worker.run_state() == (None, False)
+            coordinator.reset()
+            run_id, finished = worker.run_state()
+            assert run_id is not None and not finished
+            
+            coordinator.push(1.0, url, 1)
+            coordinator.push(2.0, url, 2)
+            coordinator.push(2.0, url, 2)
+            assert coordinator.counts() == {"pending": 2}
+            
+            # Аренда истекла (воркер убит): задача возвращается, поздний ответ отбрасывается
+            assert worker.claim("w1") == (url, 2)
+            time.sleep(0.3)
+            assert coordinator.reclaim_expired() == 1
+            assert worker.claim("w2") == (url, 2)
+            assert not worker.complete("w1", (url, 2), records)
+            assert worker.complete("w2", (url, 2), records, last_page=7)
+            assert coordinator.take_results() == [(url, 2, records, 7)]
+            assert coordinator.take_results() == []
+            
+            # Неудачная страница повторяется, пока не исчерпаны max_attempts
+            assert worker.claim("w1") == (url, 1)
+            assert worker.complete("w1", (url, 1), None)
+            assert coordinator.counts() == {"done": 1, "pending": 1}
+            assert worker.claim("w1") == (url, 1)
+            assert worker.complete("w1", (url, 1), None)
+            assert worker.claim("w1") is None
+            assert coordinator.take_results() == [(url, 1, None, None)]
+            assert coordinator.counts() == {"done": 1, "failed": 1}
+            
+            coordinator.set_finished()
+            assert worker.run_state() == (run_id, True)
+            
+            # Флаг завершения прошлого обхода не останавливает воркер, запущенный до координатора
+            with working_directory(work_dir):
+                parser = main.TGStatParser()
+            parser.coordinator_poll = 0.02
+            parser.fetch_pages = lambda tasks: {task: [] for task in tasks}
+            processed = []
+            thread = threading.Thread(target=lambda: processed.append(parser.run_worker(worker, "w3")), daemon=True)
+            thread.start()
+            time.sleep(0.2)
+            assert thread.is_alive(), "воркер вышел по флагу прошлого обхода"
+            
+            coordinator.reset()
+            assert coordinator.run_state()[0] != run_id
+            coordinator.push(1.0, url, 1)
+            for _ in range(100):
+                if coordinator.counts().get("done"):
+                    break
+                time.sleep(0.02)
+            coordinator.set_finished()
+            thread.join(5)
+            assert not thread.is_alive() and processed == [1], processed
+        finally:
+            coordinator.close()
+            worker.close()
+    
+    print("✅ Аренда, повторы и завершение обхода работают через общую базу")
+    return True
+
+
+def test_resume_after_interrupt():
+    """Проверка --resume: Ctrl+C после страницы без контрольной точки и продолжение"""
+    print("\n⏯️ Проверка продолжения прерванного обхода...")
+    
+    main = load_main()
+    expected = [f"c{page}_{index}" for page in range(1, 7) for index in range(3)]
+    
+    with tempfile.TemporaryDirectory() as work_dir, working_directory(work_dir):
+        # Контрольные точки после страниц 2 и 4; страница 5 только дописана в .part
+        parser, fetcher = stub_parser(pages=6)
+        parser.checkpoint_every = 2
+        fetcher.interrupt_at = 6
+        parser.prepare_workspace()
+        checkpoint = main.CrawlCheckpoint.start(
+            parser.checkpoint_path, kind="category", url=STUB_CATEGORY_URL, name="tech",
+            content_type="channels", max_pages=None, part=str(parser.results_dir / "channels_tech.txt.part")
+        )
+        try:
+            parser.parse_channel_data(STUB_CATEGORY_URL, None, checkpoint)
+            raise AssertionError("обход не был прерван")
+        except KeyboardInterrupt:
+            pass
+        
+        part = parser.results_dir / "channels_tech.txt.part"
+        assert fetcher.requested == [1, 2, 3, 4, 5], fetcher.requested
+        assert len(part.read_text(encoding="utf-8").splitlines()) == 15
+        
+        saved = main.CrawlCheckpoint.load(parser.checkpoint_path).state
+        assert saved["offset"] == 12 and saved["pending"][0] == 5, saved
+        
+        # Новый запуск: .part обрезается до страницы 4, страница 5 загружается снова
+        parser, fetcher = stub_parser(pages=6)
+        parser.resume_crawl()
+        assert fetcher.requested == [5, 6, 7], fetcher.requested
+        
+        result = parser.results_dir / "channels_tech.txt"
+        assert not part.exists() and not parser.checkpoint_path.exists()
+        lines = [line for line in result.read_text(encoding="utf-8").splitlines()
+                 if line and not line.startswith("#")]
+    
+    assert [line.split(".", 1)[0] for line in lines] == [str(index) for index in range(1, 19)], lines
+    assert [line.split("https://t.me/")[1].split(" ")[0] for line in lines] == expected, lines
+    
+    print(f"✅ После продолжения {len(lines)} записей без пропусков и дублей")
+    return True
+
+
+# Бюджет на импорт main.py и создание парсера (секунды)
+STARTUP_BUDGET = 0.5
+
+STARTUP_PROBE = """
+import sys, time
+start = time.perf_counter()
+import main
+parser = main.TGStatParser()
+elapsed = time.perf_counter() - start
+heavy = [name for name in ("selenium", "requests", "httpx", "lxml", "psutil", "asyncio") if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def test_startup_time():
+    """Проверка времени запуска: без тяжелых импортов и создания файлов"""
+    print("\n⏱️ Проверка времени запуска...")
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = dict(os.environ, PYTHONPATH=str(PROJECT_DIR))
+        result = subprocess.run([sys.executable, "-c", STARTUP_PROBE], cwd=work_dir, env=env,
+                                capture_output=True, text=True, timeout=60)
+        created = sorted(os.listdir(work_dir))
+    
+    assert result.returncode == 0, f"ошибка запуска: {result.stderr.strip()}"
+    
+    elapsed, _, heavy = result.stdout.strip().splitlines()[-1].partition(" ")
+    elapsed = float(elapsed)
+    print(f"   Импорт и создание парсера: {elapsed:.3f}с (бюджет {STARTUP_BUDGET}с)")
+    
+    assert elapsed <= STARTUP_BUDGET, f"запуск занял {elapsed:.3f}с при бюджете {STARTUP_BUDGET}с"
+    assert not heavy, f"при запуске импортированы тяжелые модули: {heavy}"
+    assert not created, f"при запуске созданы файлы: {', '.join(created)}"
+    
+    print("✅ Запуск укладывается в бюджет")
+    return True
+
+
 def generate_test_report():
     """Генерация отчета о тестировании"""
     print("\n" + "="*60)
@@ -212,7 +956,20 @@ def generate_test_report():
         ("Chrome установка", test_chrome_installation),
         ("Файловая структура", test_file_structure),
         ("UTF-8 кодировка", test_encoding),
-        ("Selenium базовый", test_selenium_basic)
+        ("Selenium базовый", test_selenium_basic),
+        ("Время запуска", test_startup_time),
+        ("Разбор листинга", test_listing_extraction),
+        ("Пагинатор из ссылки \"Далее\"", test_pager_next_link),
+        ("Порядок страниц после повтора", test_page_order_after_retry),
+        ("Повторы и размыкатель цепи", test_retry_and_circuit_breaker),
+        ("Адаптивный темп", test_pacing_controller),
+        ("Кэш страниц", test_page_cache),
+        ("Статистика селекторов", test_selector_stats),
+        ("Асинхронный обход", test_async_crawler),
+        ("Страницы проверки Cloudflare", test_challenge_detection),
+        ("Готовность вкладок", test_tabs_wait_for_navigation),
+        ("Очередь распределенного обхода", test_job_store),
+        ("Продолжение прерванного обхода", test_resume_after_interrupt)
     ]
     
     results = {}